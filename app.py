@@ -3,10 +3,18 @@ Interface Streamlit pour ResumeRadar
 Mode Analyse + Mode CVs & Contact
 Premium SaaS Dark Mode UI
 """
+import logging
 import streamlit as st
 from urllib.parse import quote
 
-from config.settings import TOP_CANDIDATES, EMAIL_SUBJECT, EMAIL_BODY
+from config.settings import (
+    TOP_CANDIDATES, TOP_K_RESULTS, OLLAMA_STREAMING, LLM_CACHE_ENABLED,
+    EMAIL_SUBJECT, EMAIL_BODY, LOG_LEVEL, WARMUP_ENABLED, EMBEDDING_SERVICE_ENABLED,
+    JOBS_BACKGROUND_DEFAULT, JOBS_POLL_SECONDS, OLLAMA_MODEL, EMBEDDING_MODEL
+)
+
+# Logs structures (temps par etape, etc.)
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 
 # Configuration de la page
 st.set_page_config(
@@ -16,6 +24,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+@st.cache_resource
+def log_configuration():
+    """Trace la configuration une seule fois par processus (pas a chaque rerun)"""
+    logging.getLogger(__name__).info(
+        "Configuration chargee (Ollama : %s, Embeddings : %s)", OLLAMA_MODEL, EMBEDDING_MODEL
+    )
+
+
+log_configuration()
+
+
 # ============================================================
 # CSS - Premium SaaS Dark Mode
 # ============================================================
@@ -613,15 +633,45 @@ st.markdown("""
 
 # === FONCTIONS UTILITAIRES ===
 
-def extract_text_from_pdf(uploaded_file) -> str:
-    """Extrait le texte brut d'un fichier PDF uploade"""
-    from pypdf import PdfReader
-    import io
-    reader = PdfReader(io.BytesIO(uploaded_file.getbuffer()))
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text
+LLM_CARD_HTML = """
+<div class="llm-card">
+    <div class="llm-label">Recommandations du LLM</div>
+</div>
+"""
+
+
+def split_job_descriptions(text):
+    """Separe plusieurs descriptions de poste delimitees par une ligne ---"""
+    import re
+    parts = re.split(r"^\s*-{3,}\s*$", text, flags=re.MULTILINE)
+    return [p.strip() for p in parts if p.strip()]
+
+
+def render_roles(roles):
+    """Affiche le classement par poste, le meilleur poste par candidat et l'affectation"""
+    st.markdown('<div class="section-title">Classement par poste</div>', unsafe_allow_html=True)
+    for title, ranking in zip(roles["titles"], roles["rankings"]):
+        with st.expander(title, expanded=True):
+            st.table([
+                {"Candidat": c["name"], "Score": f"{int(c['score'] * 100)}%"}
+                for c in ranking
+            ])
+
+    with st.expander("Meilleur poste par candidat"):
+        st.table([
+            {"Candidat": c["name"], "Poste": roles["titles"][c["role"]],
+             "Score": f"{int(c['score'] * 100)}%"}
+            for c in sorted(roles["best_role"], key=lambda c: c["score"], reverse=True)
+        ])
+
+    if roles.get("assignment"):
+        st.markdown('<div class="section-label">Affectation un candidat par poste</div>',
+                    unsafe_allow_html=True)
+        st.table([
+            {"Poste": roles["titles"][role], "Candidat": c["name"],
+             "Score": f"{int(c['score'] * 100)}%"}
+            for role, c in sorted(roles["assignment"].items())
+        ])
 
 
 def build_mailto_link(emails, subject, body):
@@ -639,6 +689,96 @@ def get_score_class(score_pct):
     return "score-low"
 
 
+def load_analysis_result(result):
+    """Charge le resultat d'une analyse (bouton ou job d'arriere-plan) dans les cles review_*"""
+    st.session_state.review_candidates = result["candidates"]
+    st.session_state.review_analysis = result["analysis"]
+    st.session_state.review_cache_stats = result["cache_stats"]
+    st.session_state.review_llm_timings = result["llm_timings"]
+    st.session_state.review_llm_cache_stats = result["llm_cache_stats"]
+    st.session_state.review_timings = result["timings"]
+    st.session_state.review_counters = result["counters"]
+    st.session_state.review_skipped = result["skipped"]
+    st.session_state.review_top_n = result["top_n"]
+    st.session_state.review_job_hash = result["job_hash"]
+    st.session_state.review_index = 0
+    if result["roles"]:
+        st.session_state.review_roles = result["roles"]
+    else:
+        st.session_state.pop("review_roles", None)
+    if result.get("session") is not None:
+        st.session_state.review_session = result["session"]
+
+
+def has_active_jobs():
+    """Vrai si un job de la session est encore en file ou en cours"""
+    from utils.jobs import get_job_queue, JOB_QUEUED, JOB_RUNNING
+    queue = get_job_queue()
+    return any(
+        (queue.status(job_id) or {}).get("status") in (JOB_QUEUED, JOB_RUNNING)
+        for job_id in st.session_state.get("review_jobs", [])
+    )
+
+
+def render_jobs():
+    """Affiche les jobs de la session ; charge les resultats des jobs termines"""
+    from utils.jobs import get_job_queue, JOB_DONE, JOB_FAILED, JOB_QUEUED
+    queue = get_job_queue()
+    loaded = st.session_state.setdefault("review_jobs_loaded", [])
+
+    jobs = [job for job in map(queue.status, st.session_state.review_jobs) if job is not None]
+
+    # Seul le dernier job termine est charge ; les autres restent accessibles via "Afficher"
+    finished = [job for job in jobs if job["status"] == JOB_DONE and job["id"] not in loaded]
+    if finished:
+        loaded.extend(job["id"] for job in finished)
+        result = queue.result(max(finished, key=lambda job: job["finished_at"])["id"])
+        if result is not None:
+            load_analysis_result(result)
+            st.rerun()
+
+    st.markdown('<div class="section-label">Analyses en arriere-plan</div>', unsafe_allow_html=True)
+    for job in reversed(jobs):
+        job_id = job["id"]
+        label = job["label"] or job_id
+        if job["status"] == JOB_DONE:
+            col_label, col_btn = st.columns([4, 1])
+            with col_label:
+                seconds = job["finished_at"] - (job["started_at"] or job["created_at"])
+                st.caption(f"✅ {label} · termine en {seconds:.1f} s")
+            with col_btn:
+                if st.button("Afficher", key=f"job_{job_id}"):
+                    result = queue.result(job_id)
+                    if result is not None:
+                        load_analysis_result(result)
+                        st.rerun()
+        elif job["status"] == JOB_FAILED:
+            st.caption(f"⚠️ {label} · echec : {job['error']}")
+        elif job["status"] == JOB_QUEUED:
+            st.caption(f"⏳ {label} · en attente")
+        else:
+            st.progress(job["progress"] or 0.0, text=f"{label} · {job['stage']}")
+
+
+@st.fragment(run_every=JOBS_POLL_SECONDS)
+def poll_jobs():
+    """Rafraichit le suivi des jobs sans relancer toute la page"""
+    render_jobs()
+    if not has_active_jobs():
+        # Plus rien a suivre : un rerun complet arrete le rafraichissement
+        st.rerun()
+
+
+@st.cache_resource
+def start_background_warmup():
+    """Prechauffe le modele d'embeddings une seule fois pour toutes les sessions"""
+    from utils.warmup import start_warmup
+    return start_warmup()
+
+
+warmup = start_background_warmup() if WARMUP_ENABLED else None
+
+
 # ============================================================
 # SIDEBAR
 # ============================================================
@@ -678,6 +818,66 @@ if "review_candidates" in st.session_state:
     emails_count = len([c for c in cands if c["email"]])
     avg_score = int(sum(c["score"] for c in cands) / candidates_count * 100)
 
+    cache_row = ""
+    cache_stats = st.session_state.get("review_cache_stats")
+    if cache_stats:
+        cache_row = f"""
+        <div class="stats-row">
+            <span class="label">Cache embeddings</span>
+            <span class="value">{cache_stats['hits']} hits / {cache_stats['misses']} misses</span>
+        </div>"""
+
+    timing_rows = ""
+    timings = st.session_state.get("review_timings")
+    if timings:
+        from utils.timing import STAGE_LABELS
+        timing_rows = '<div class="stats-title" style="margin-top:0.8rem;">Temps par etape</div>'
+        for stage, t in timings.items():
+            rate = f" · {t['items_per_sec']:.0f}/s" if t.get("items_per_sec") and t["items"] > 1 else ""
+            timing_rows += f"""
+        <div class="stats-row">
+            <span class="label">{STAGE_LABELS.get(stage, stage)}</span>
+            <span class="value">{t['seconds']:.2f} s{rate}</span>
+        </div>"""
+
+    counters = st.session_state.get("review_counters") or {}
+    if counters.get("prefilter_pruned"):
+        saved = counters.get("prefilter_seconds_saved", 0.0)
+        timing_rows += f"""
+        <div class="stats-row">
+            <span class="label">Elagues (lexical)</span>
+            <span class="value">{int(counters['prefilter_pruned'])} CVs · ~{saved:.1f} s gagnees</span>
+        </div>"""
+
+    if counters.get("pages_skipped"):
+        timing_rows += f"""
+        <div class="stats-row">
+            <span class="label">Pages lues / ignorees</span>
+            <span class="value">{int(counters.get('pages_read', 0))} / {int(counters['pages_skipped'])}</span>
+        </div>"""
+
+    if counters.get("prompt_tokens"):
+        timing_rows += f"""
+        <div class="stats-row">
+            <span class="label">Tokens prompt (estimes)</span>
+            <span class="value">{int(counters['prompt_tokens'])}</span>
+        </div>"""
+
+    if counters.get("duplicates_merged"):
+        timing_rows += f"""
+        <div class="stats-row">
+            <span class="label">Doublons fusionnes</span>
+            <span class="value">{int(counters['duplicates_merged'])} CVs</span>
+        </div>"""
+
+    llm_cache_stats = st.session_state.get("review_llm_cache_stats")
+    if llm_cache_stats:
+        cache_row += f"""
+        <div class="stats-row">
+            <span class="label">Cache LLM</span>
+            <span class="value">{int(llm_cache_stats['hit_rate'] * 100)}% hits</span>
+        </div>"""
+
     st.sidebar.markdown(f"""
     <div class="stats-card">
         <div class="stats-title">Derniere analyse</div>
@@ -693,10 +893,45 @@ if "review_candidates" in st.session_state:
             <span class="label">Score moyen</span>
             <span class="value accent">{avg_score}%</span>
         </div>
+        {cache_row}
+        {timing_rows}
     </div>
     """, unsafe_allow_html=True)
 
 
+# Rapport de demarrage
+if warmup is not None:
+    with st.sidebar.expander("Demarrage"):
+        if not warmup.done.is_set():
+            st.caption("Prechauffage du modele en cours...")
+        for step, result in warmup.report.items():
+            state = "" if result["ok"] else " (echec)"
+            st.caption(f"{step} : {result['seconds']:.2f} s{state}")
+
+# Metriques du service d'embeddings partage
+if EMBEDDING_SERVICE_ENABLED:
+    from utils.embedding_service import get_embedding_service
+    service_metrics = get_embedding_service().metrics()
+    with st.sidebar.expander("Service d'embeddings"):
+        st.caption(f"File d'attente : {service_metrics['queue_depth']}")
+        st.caption(f"Lots traites : {service_metrics['batches']}")
+        st.caption(f"Taille moyenne des lots : {service_metrics['avg_batch_size']:.1f}")
+        st.caption(f"Plus grand lot : {service_metrics['largest_batch_size']}")
+
+# Sonde Ollama : joignabilite, latence et presence du modele
+with st.sidebar.expander("Serveur Ollama"):
+    if st.button("Tester la connexion", use_container_width=True):
+        from utils.ollama_client import get_ollama_client
+        client = get_ollama_client()
+        probe = client.probe()
+        if not probe["ok"]:
+            st.caption(f"Injoignable : {probe['error']}")
+        else:
+            st.caption(f"Latence : {probe['latency_ms']:.0f} ms")
+            st.caption(f"Modele {client.model} : {'disponible' if probe['model_available'] else 'absent'}")
+        st.caption(f"Connexions ouvertes : {client.connections_opened}")
+
+
 # ============================================================
 # MODE ANALYSE
 # ============================================================
@@ -713,13 +948,28 @@ if mode == "Analyse":
 
     # Upload
     st.markdown('<div class="section-label">Documents</div>', unsafe_allow_html=True)
-    uploaded_files = st.file_uploader(
-        "Uploadez vos CVs (PDF)",
-        type=["pdf"],
-        accept_multiple_files=True,
-        key="review_uploader",
+    source = st.radio(
+        "Source des CVs",
+        ["CVs uploades", "Vivier de CVs"],
+        horizontal=True,
         label_visibility="collapsed"
     )
+    use_pool = source == "Vivier de CVs"
+
+    uploaded_files = []
+    save_to_pool = False
+    if not use_pool:
+        uploaded_files = st.file_uploader(
+            "Uploadez vos CVs (PDF)",
+            type=["pdf"],
+            accept_multiple_files=True,
+            key="review_uploader",
+            label_visibility="collapsed"
+        )
+        save_to_pool = st.checkbox("Ajouter ces CVs au vivier persistant")
+    else:
+        from utils.cv_index import pool_size
+        st.caption(f"{pool_size()} CV(s) dans le vivier")
 
     # Description du poste
     st.markdown('<div class="section-label">Description du poste</div>', unsafe_allow_html=True)
@@ -729,9 +979,20 @@ if mode == "Analyse":
         placeholder="Ex: Recherche Data Engineer Python avec experience Kafka, Spark, et SQL...",
         label_visibility="collapsed"
     )
+    multi_role = False
+    assign_one_per_role = False
+    if not use_pool:
+        multi_role = st.checkbox(
+            "Plusieurs postes (separer les descriptions par une ligne ---)"
+        )
+        if multi_role:
+            assign_one_per_role = st.checkbox("Affecter un candidat distinct a chaque poste")
 
     # Slider
-    max_candidates = len(uploaded_files) if uploaded_files else TOP_CANDIDATES
+    if use_pool:
+        max_candidates = TOP_K_RESULTS
+    else:
+        max_candidates = len(uploaded_files) if uploaded_files else TOP_CANDIDATES
     top_n = st.slider(
         "Candidats a retenir",
         min_value=1,
@@ -739,95 +1000,161 @@ if mode == "Analyse":
         value=min(TOP_CANDIDATES, max_candidates) if max_candidates > 0 else 1
     )
 
+    analysis_mode = st.radio(
+        "Analyse LLM",
+        ["Synthese globale", "Par candidat"],
+        horizontal=True,
+        help="Par candidat : un prompt court par candidat, envoyes en parallele a Ollama"
+    )
+    stream_llm_output = st.checkbox(
+        "Afficher les recommandations au fil de la generation",
+        value=OLLAMA_STREAMING,
+        disabled=analysis_mode == "Par candidat"
+    )
+    bypass_llm_cache = st.checkbox(
+        "Ignorer le cache LLM (forcer une nouvelle generation)",
+        value=not LLM_CACHE_ENABLED
+    )
+    run_in_background = st.checkbox(
+        "Executer en arriere-plan (les analyses s'enchainent, la page reste libre)",
+        value=JOBS_BACKGROUND_DEFAULT
+    )
+
     st.markdown("")  # spacing
 
     # CTA
     analyze_btn = st.button("Analyser et Trier", type="primary", use_container_width=True)
 
-    if analyze_btn and uploaded_files and job_description:
-        from utils.email_extractor import extract_email
-        from utils.scoring import score_candidates
-        from utils.email_extractor import extract_name_from_filename
-        from langchain_community.llms import Ollama  # type: ignore
-        from config.settings import OLLAMA_MODEL, OLLAMA_BASE_URL, OLLAMA_TEMPERATURE
-
-        candidates = []
-        progress = st.progress(0)
-        status = st.empty()
-
-        # Extraction texte + email
-        for i, uploaded_file in enumerate(uploaded_files):
-            status.text(f"Extraction de {uploaded_file.name}...")
-            text = extract_text_from_pdf(uploaded_file)
-            email = extract_email(text)
-            name = extract_name_from_filename(uploaded_file.name)
-            pdf_bytes = uploaded_file.getvalue()
-
-            candidates.append({
-                "name": name,
-                "email": email,
-                "text": text,
-                "filename": uploaded_file.name,
-                "pdf_bytes": pdf_bytes
-            })
-            progress.progress((i + 1) / len(uploaded_files))
-
-        # Scoring par embeddings
-        status.text("Calcul des scores de pertinence...")
-        ranked = score_candidates(job_description, candidates, top_n)
-
-        # Analyse LLM
-        status.text("Analyse par le LLM...")
-        llm = Ollama(
-            model=OLLAMA_MODEL,
-            base_url=OLLAMA_BASE_URL,
-            temperature=OLLAMA_TEMPERATURE
-        )
-
-        candidates_summary = ""
-        for i, c in enumerate(ranked):
-            score_pct = int(c["score"] * 100)
-            candidates_summary += (
-                f"\n--- Candidat {i+1}: {c['name']} (Score: {score_pct}%) ---\n"
-                f"{c['text'][:800]}\n"
+    if analyze_btn and job_description and (uploaded_files or use_pool):
+        params = {
+            "job_description": job_description,
+            "job_descriptions": split_job_descriptions(job_description) if multi_role else None,
+            "uploads": [] if use_pool else [(f.name, f.getvalue()) for f in uploaded_files],
+            "use_pool": use_pool,
+            "top_n": top_n,
+            "assign": multi_role and assign_one_per_role,
+            "analysis_mode": "candidate" if analysis_mode == "Par candidat" else "global",
+            "stream": stream_llm_output,
+            "bypass_llm_cache": bypass_llm_cache,
+            "save_to_pool": save_to_pool,
+        }
+        # Etat incremental : seuls les nouveaux fichiers sont extraits et encodes
+        session = None
+        if not use_pool:
+            from utils.incremental import IncrementalAnalysis
+            if "review_session" not in st.session_state:
+                st.session_state.review_session = IncrementalAnalysis()
+            session = st.session_state.review_session
+
+        if run_in_background:
+            from utils.jobs import get_job_queue, run_analysis_job
+            job_id = get_job_queue().submit(
+                run_analysis_job, dict(params, session=session),
+                label=job_description.strip().splitlines()[0][:60]
             )
+            st.session_state.review_jobs = st.session_state.get("review_jobs", []) + [job_id]
+            # L'identifiant dans l'URL permet de retrouver le job apres un rafraichissement
+            st.query_params["jobs"] = ",".join(st.session_state.review_jobs)
+        else:
+            from utils.pipeline import run_analysis
+
+            progress = st.progress(0)
+            status = st.empty()
+            cards, live_output = [], []
+
+            def report(stage, fraction=None):
+                status.text(f"{stage}...")
+                if fraction is not None:
+                    progress.progress(min(fraction, 1.0))
+
+            def on_ranked(ranked):
+                if params["analysis_mode"] == "candidate":
+                    # Une carte par candidat, remplie des que sa reponse arrive
+                    progress.empty()
+                    st.markdown(LLM_CARD_HTML, unsafe_allow_html=True)
+                    for i, c in enumerate(ranked):
+                        st.markdown(f"**{i + 1}. {c['name']}**")
+                        card = st.empty()
+                        card.caption("Analyse en cours...")
+                        cards.append(card)
+                elif params["stream"]:
+                    progress.empty()
+                    st.markdown(LLM_CARD_HTML, unsafe_allow_html=True)
+                    live_output.append(st.empty())
+
+            try:
+                result = run_analysis(
+                    params, session=session, report=report, on_ranked=on_ranked,
+                    on_answer=lambda i, text: cards[i].markdown(text),
+                    on_token=lambda text: live_output[0].markdown(text + "▌")
+                )
+            except ValueError as exc:
+                progress.empty()
+                status.empty()
+                st.warning(str(exc))
+                st.stop()
+
+            load_analysis_result(result)
+            progress.empty()
+            status.empty()
+            st.rerun()
 
-        llm_prompt = f"""Tu es un assistant recruteur. Voici une description de poste et les candidats retenus.
-
-DESCRIPTION DU POSTE :
-{job_description}
-
-CANDIDATS SELECTIONNES (tries par pertinence) :
-{candidates_summary}
-
-Pour chaque candidat, explique en 2-3 lignes :
-1. Pourquoi il correspond au poste
-2. Ses points forts par rapport a la description
-3. Un point de vigilance eventuel
-
-Sois concis et precis."""
-
-        llm_analysis = llm.invoke(llm_prompt)
-
-        st.session_state.review_candidates = ranked
-        st.session_state.review_analysis = llm_analysis
-
-        progress.empty()
-        status.empty()
-        st.rerun()
+    if "review_jobs" not in st.session_state and st.query_params.get("jobs"):
+        st.session_state.review_jobs = st.query_params["jobs"].split(",")
+    if st.session_state.get("review_jobs"):
+        if has_active_jobs():
+            poll_jobs()
+        else:
+            render_jobs()
 
     # === RESULTATS ===
+    # Deplacer le curseur re-decoupe le classement existant, sans recalcul, si le
+    # resultat affiche vient de la description de poste courante de la session
+    # (pas apres un rafraichissement, ni pendant qu'un job met la session a jour)
+    from utils.pipeline import job_hash
+    slider_moved = top_n != st.session_state.get("review_slider_top_n", top_n)
+    st.session_state.review_slider_top_n = top_n
+    session = st.session_state.get("review_session")
+    if slider_moved and session is not None and session.lock.acquire(blocking=False):
+        try:
+            if (
+                not use_pool and session.scores is not None
+                and "review_candidates" in st.session_state
+                and "review_roles" not in st.session_state
+                and top_n != st.session_state.get("review_top_n")
+                and session.job_description is not None
+                and st.session_state.get("review_job_hash") == job_hash(session.job_description)
+            ):
+                st.session_state.review_candidates = session.rank(top_n)
+                st.session_state.review_top_n = top_n
+                st.session_state.review_index = 0
+        finally:
+            session.lock.release()
+
+    if st.session_state.get("review_skipped"):
+        st.warning("CVs ignores : " + " ; ".join(
+            f"{item['filename']} ({item['reason']})" for item in st.session_state.review_skipped
+        ))
+
     if "review_candidates" in st.session_state and "review_analysis" in st.session_state:
 
         st.markdown('<div class="sep"></div>', unsafe_allow_html=True)
 
+        roles = st.session_state.get("review_roles")
+        if roles:
+            render_roles(roles)
+
         # LLM Analysis
-        st.markdown("""
-        <div class="llm-card">
-            <div class="llm-label">Recommandations du LLM</div>
-        </div>
-        """, unsafe_allow_html=True)
-        st.markdown(st.session_state.review_analysis)
+        if st.session_state.review_analysis:
+            st.markdown(LLM_CARD_HTML, unsafe_allow_html=True)
+            st.markdown(st.session_state.review_analysis)
+
+        llm_timings = st.session_state.get("review_llm_timings")
+        if llm_timings:
+            st.caption(
+                f"Premier token : {llm_timings['ttft']:.1f} s · "
+                f"Generation totale : {llm_timings['total']:.1f} s"
+            )
 
         # Classement
         st.markdown('<div class="sep"></div>', unsafe_allow_html=True)
@@ -856,8 +1183,15 @@ Sois concis et precis."""
         st.info("Passez en mode **CVs & Contact** pour consulter les CVs et contacter les candidats.")
 
         if st.button("Nouvelle analyse", use_container_width=True):
-            for key in ["review_candidates", "review_analysis", "review_index"]:
+            for key in [
+                "review_candidates", "review_analysis", "review_index",
+                "review_cache_stats", "review_llm_timings", "review_llm_cache_stats",
+                "review_timings", "review_roles", "review_counters", "review_skipped",
+                "review_top_n", "review_job_hash", "review_session", "review_jobs",
+                "review_jobs_loaded",
+            ]:
                 st.session_state.pop(key, None)
+            st.query_params.pop("jobs", None)
             st.rerun()
 
 
@@ -917,7 +1251,19 @@ elif mode == "CVs & Contact":
                 st.rerun()
 
         # Infos candidat - Grid
-        email_display = current['email'] if current['email'] else '<span style="color:rgba(255,255,255,0.2);">Non trouve</span>'
+        alternates = current.get("alternate_filenames") or []
+        filename_display = current['filename']
+        if alternates:
+            filename_display += f'<br><span style="color:rgba(255,255,255,0.4);">aussi : {", ".join(alternates)}</span>'
+        not_found = '<span style="color:rgba(255,255,255,0.2);">Non trouve</span>'
+        email_display = current['email'] if current['email'] else not_found
+        phone_display = current.get('phone') or not_found
+        links = [
+            f'<a href="{current[field]}" target="_blank">{label}</a>'
+            for field, label in (("linkedin", "LinkedIn"), ("github", "GitHub"))
+            if current.get(field)
+        ]
+        links_display = " · ".join(links) if links else not_found
         st.markdown(f"""
         <div class="info-grid">
             <div class="info-item">
@@ -926,7 +1272,15 @@ elif mode == "CVs & Contact":
             </div>
             <div class="info-item">
                 <div class="info-label">Fichier</div>
-                <div class="info-value">{current['filename']}</div>
+                <div class="info-value">{filename_display}</div>
+            </div>
+            <div class="info-item">
+                <div class="info-label">Telephone</div>
+                <div class="info-value">{phone_display}</div>
+            </div>
+            <div class="info-item">
+                <div class="info-label">Liens</div>
+                <div class="info-value">{links_display}</div>
             </div>
         </div>
         """, unsafe_allow_html=True)
@@ -0,0 +1,265 @@
+"""
+Classement de CVs en ligne de commande (sans interface Streamlit)
+Reutilise l'extraction parallele, le scoring par embeddings et les caches
+
+Exemples :
+    python batch_rank.py cvs/ --jd poste_data.txt --top-n 10 --output resultats.json
+    python batch_rank.py nouveaux_cvs/ --index vivier.npz --jd poste_data.txt
+"""
+import argparse
+import csv
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+from config.settings import TOP_CANDIDATES, PDF_EXTRACTION_WORKERS, DEDUP_ENABLED
+from utils.dedup import deduplicate_candidates
+from utils.email_extractor import extract_name_from_filename
+from utils.pdf_extractor import extract_documents_parallel
+from utils.scoring import (
+    embed_candidates, embed_texts_cached, score_candidates, score_candidates_multi,
+)
+
+# Longueur du texte conserve dans l'index pour l'analyse LLM
+INDEX_TEXT_EXCERPT = 2000
+
+
+def collect_pdf_paths(inputs: List[str]) -> List[str]:
+    """Resout une liste de dossiers / globs / fichiers en chemins PDF tries"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, "*.pdf")) + glob.glob(os.path.join(item, "*.PDF"))
+        else:
+            matches = glob.glob(item)
+        paths.extend(p for p in matches if p.lower().endswith(".pdf"))
+    # Dedoublonner en conservant un ordre stable
+    return sorted(set(paths))
+
+
+def load_candidates(pdf_paths: List[str], workers: int) -> List[Dict]:
+    """Extrait texte, contacts et nom de chaque CV"""
+    buffers = []
+    for path in pdf_paths:
+        with open(path, "rb") as f:
+            buffers.append(f.read())
+
+    documents = extract_documents_parallel(buffers, max_workers=workers)
+    for path, document in zip(pdf_paths, documents):
+        if document["skipped"]:
+            print(f"CV ignore : {path} ({document['reason']})", file=sys.stderr)
+    kept = [i for i, document in enumerate(documents) if not document["skipped"]]
+    pdf_paths = [pdf_paths[i] for i in kept]
+    buffers = [buffers[i] for i in kept]
+    documents = [documents[i] for i in kept]
+    texts = [document["text"] for document in documents]
+    skipped = sum(document["pages_skipped"] for document in documents)
+    if skipped:
+        print(f"{skipped} pages ignorees (plafond PDF_MAX_PAGES / PDF_MAX_CHARS)", file=sys.stderr)
+    return [
+        {
+            "name": extract_name_from_filename(os.path.basename(path)),
+            **document["contacts"],
+            "text": text,
+            "filename": os.path.basename(path),
+            "path": path,
+            "file_hash": hashlib.sha256(buffer).hexdigest(),
+        }
+        for path, text, buffer, document in zip(pdf_paths, texts, buffers, documents)
+    ]
+
+
+def update_index(path: str, candidates: List[Dict]):
+    """Ajoute les CVs a l'index ANN sur disque (cree s'il n'existe pas)"""
+    from utils.ann_index import IVFIndex
+
+    index = IVFIndex.load(path) if os.path.exists(path) else None
+    if candidates:
+        matrix = embed_candidates(candidates)
+        if index is None:
+            index = IVFIndex(matrix.shape[1])
+        index.add(
+            # Hash des octets : deux PDFs scannes sans texte restent distincts
+            [c["file_hash"] for c in candidates],
+            matrix,
+            [
+                {"name": c["name"], "email": c["email"], "filename": c["filename"],
+                 "text": c["text"][:INDEX_TEXT_EXCERPT]}
+                for c in candidates
+            ]
+        )
+        # Partitionner une fois que la recherche exacte devient trop couteuse
+        if not index.is_trained and len(index) > index.exact_threshold:
+            index.train()
+        index.save(path)
+    return index
+
+
+def rank_from_index(index, job_description: str, top_n: int) -> List[Dict]:
+    """Classe les CVs de l'index par rapport a une description de poste"""
+    jd_embedding = embed_texts_cached([job_description])[0]
+    return [
+        {**meta, "score": score}
+        for _, score, meta in index.search(jd_embedding, top_n)
+    ]
+
+
+def analyze_with_llm(job_description: str, ranked: List[Dict], mode: str) -> None:
+    """Ajoute l'analyse LLM aux candidats retenus ('global' ou 'candidate')"""
+    from utils.llm_analysis import (
+        build_analysis_prompt, analyze_candidates_concurrently, ollama_generate,
+    )
+    from utils.llm_cache import cached_generate
+
+    generate = cached_generate(ollama_generate)
+    if mode == "candidate":
+        analyses = analyze_candidates_concurrently(job_description, ranked, generate=generate)
+        for candidate, analysis in zip(ranked, analyses):
+            candidate["analysis"] = analysis
+    else:
+        analysis = generate(build_analysis_prompt(job_description, ranked))
+        for candidate in ranked:
+            candidate["analysis"] = analysis
+
+
+def write_results(results: List[Dict], output: str, fmt: str) -> None:
+    """Ecrit les classements en JSON ou CSV (stdout si output vaut '-')"""
+    stream = sys.stdout if output == "-" else open(output, "w", newline="", encoding="utf-8")
+    try:
+        if fmt == "json":
+            json.dump(results, stream, ensure_ascii=False, indent=2)
+            stream.write("\n")
+        else:
+            fields = ["job", "rank", "name", "email", "phone", "linkedin", "github", "score",
+                      "filename", "analysis"]
+            writer = csv.DictWriter(stream, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            for job in results:
+                for row in job["ranking"]:
+                    writer.writerow({"job": job["job"], **row})
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Classe des CVs PDF par rapport a des descriptions de poste")
+    parser.add_argument("inputs", nargs="*", help="Dossiers, fichiers ou globs de CVs PDF")
+    parser.add_argument("--jd", action="append", required=True,
+                        help="Fichier texte de description de poste (repetable)")
+    parser.add_argument("--top-n", type=int, default=TOP_CANDIDATES,
+                        help="Nombre de candidats a retenir par poste (0 = tous)")
+    parser.add_argument("--llm", choices=["none", "global", "candidate"], default="none",
+                        help="Analyse LLM des candidats retenus")
+    parser.add_argument("--workers", type=int, default=PDF_EXTRACTION_WORKERS,
+                        help="Processus d'extraction PDF (0 = un par coeur)")
+    parser.add_argument("--format", choices=["json", "csv"], default=None,
+                        help="Format de sortie (deduit de l'extension par defaut)")
+    parser.add_argument("--output", "-o", default="-", help="Fichier de sortie ('-' = stdout)")
+    parser.add_argument("--assign", action="store_true",
+                        help="Avec plusieurs postes : affecter un candidat distinct a chaque poste")
+    parser.add_argument("--index",
+                        help="Index ANN (.npz) : les CVs y sont ajoutes et le classement "
+                             "porte sur tout l'index")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.output.lower().endswith(".csv") else "json")
+
+    if args.index and not args.index.endswith(".npz"):
+        print("L'index doit avoir l'extension .npz.", file=sys.stderr)
+        return 1
+
+    pdf_paths = collect_pdf_paths(args.inputs)
+    if not pdf_paths and not (args.index and os.path.exists(args.index)):
+        print("Aucun CV PDF trouve.", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    candidates = load_candidates(pdf_paths, args.workers) if pdf_paths else []
+    extraction_time = time.perf_counter() - start
+
+    if DEDUP_ENABLED and len(candidates) > 1:
+        candidates, duplicates = deduplicate_candidates(candidates)
+        merged = duplicates["exact"] + duplicates["near"]
+        if merged:
+            print(f"{merged} CVs en double fusionnes "
+                  f"({duplicates['exact']} exacts, {duplicates['near']} quasi-doublons)",
+                  file=sys.stderr)
+
+    index = update_index(args.index, candidates) if args.index else None
+
+    job_descriptions = []
+    for jd_path in args.jd:
+        with open(jd_path, encoding="utf-8") as f:
+            job_descriptions.append(f.read())
+
+    step = time.perf_counter()
+    assignment = None
+    if index is not None:
+        top_n = args.top_n if args.top_n > 0 else len(index)
+        rankings = [rank_from_index(index, jd, top_n) for jd in job_descriptions]
+    elif len(job_descriptions) > 1:
+        # Plusieurs postes : CVs encodes une fois, matrice postes x CVs en une passe
+        top_n = args.top_n if args.top_n > 0 else len(candidates)
+        multi = score_candidates_multi(job_descriptions, candidates, top_n, assign=args.assign)
+        rankings = multi["rankings"]
+        assignment = multi["assignment"]
+    else:
+        top_n = args.top_n if args.top_n > 0 else len(candidates)
+        rankings = [score_candidates(job_descriptions[0], list(candidates), top_n)]
+    scoring_time = time.perf_counter() - step
+
+    results = []
+    for role, (jd_path, job_description, ranked) in enumerate(
+        zip(args.jd, job_descriptions, rankings)
+    ):
+        if args.llm != "none":
+            analyze_with_llm(job_description, ranked, args.llm)
+
+        result = {
+            "job": os.path.basename(jd_path),
+            "ranking": [
+                {
+                    "rank": i + 1,
+                    "name": c["name"],
+                    "email": c["email"],
+                    "phone": c.get("phone", ""),
+                    "linkedin": c.get("linkedin", ""),
+                    "github": c.get("github", ""),
+                    "score": round(c["score"], 4),
+                    "filename": c["filename"],
+                    "alternate_filenames": c.get("alternate_filenames", []),
+                    "analysis": c.get("analysis", ""),
+                }
+                for i, c in enumerate(ranked)
+            ],
+        }
+        if assignment is not None:
+            assigned = assignment.get(role)
+            result["assigned"] = assigned and {
+                "name": assigned["name"],
+                "filename": assigned["filename"],
+                "score": round(assigned["score"], 4),
+            }
+        results.append(result)
+
+    total_time = max(time.perf_counter() - start, 1e-9)
+    extraction_time = max(extraction_time, 1e-9)
+    write_results(results, args.output, fmt)
+
+    count = len(candidates)
+    print(
+        f"{count} CVs, {len(args.jd)} poste(s) en {total_time:.2f} s "
+        f"({count / total_time:.1f} CVs/s) | extraction {extraction_time:.2f} s "
+        f"({count / extraction_time:.1f} CVs/s) | scoring {scoring_time:.2f} s",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
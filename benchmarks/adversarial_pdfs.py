@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+PDFs pathologiques pour verifier l'extraction isolee
+- Fichier tronque / illisible (erreur de parsing)
+- Page au flux de contenu enorme (extraction tres lente)
+- Flux compresse qui explose en memoire (bombe de decompression)
+Les CVs normaux du meme lot doivent etre extraits malgre tout.
+
+Exemple :
+    python -m benchmarks.adversarial_pdfs --timeout 2 --max-rss-mb 100
+"""
+import argparse
+import json
+import sys
+import time
+import zlib
+from typing import Dict, List
+
+from benchmarks.corpus import assemble_pdf, generate_corpus
+from utils.pdf_extractor import extract_documents_sandboxed
+
+
+def single_page_pdf(content: bytes, stream_filter: bytes = b"") -> bytes:
+    """PDF d'une page dont le flux de contenu est fourni tel quel"""
+    return assemble_pdf([
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 5 0 R "
+        b"/Resources << /Font << /F1 3 0 R >> >> >>",
+        b"<< /Length " + str(len(content)).encode() + stream_filter + b" >>\nstream\n"
+        + content + b"\nendstream",
+    ])
+
+
+def malformed_pdf() -> bytes:
+    """En-tete PDF suivi de donnees sans structure"""
+    return b"%PDF-1.4\n" + bytes(range(256)) * 64
+
+
+def slow_pdf(operators: int = 500_000) -> bytes:
+    """Une page avec des centaines de milliers d'operateurs texte"""
+    return single_page_pdf(b"BT /F1 10 Tf " + b"(x) Tj " * operators + b"ET")
+
+
+def memory_bomb_pdf(decompressed_mb: int = 70) -> bytes:
+    """
+    Flux de quelques dizaines de Ko qui occupe des centaines de Mo une fois
+    decompresse et analyse ; 70 Mo restent sous la limite de decompression
+    de pypdf (75 Mo), c'est donc la limite memoire du worker qui doit agir.
+    """
+    payload = b"BT /F1 10 Tf (" + b"A" * (decompressed_mb * 1024 * 1024) + b") Tj ET"
+    return single_page_pdf(zlib.compress(payload, 9), b" /Filter /FlateDecode")
+
+
+def adversarial_batch(normal: int = 4) -> List[Dict]:
+    """Lot melangeant CVs normaux et fichiers pathologiques (avec la raison attendue)"""
+    batch = [
+        {"filename": item["filename"], "pdf_bytes": item["pdf_bytes"], "expected": "ok",
+         "expected_reason": ""}
+        for item in generate_corpus(normal)
+    ]
+    batch.insert(1, {"filename": "malformed.pdf", "pdf_bytes": malformed_pdf(),
+                     "expected": "skipped", "expected_reason": "PdfStreamError"})
+    batch.insert(2, {"filename": "slow.pdf", "pdf_bytes": slow_pdf(),
+                     "expected": "skipped", "expected_reason": "delai depasse"})
+    batch.insert(3, {"filename": "bomb.pdf", "pdf_bytes": memory_bomb_pdf(),
+                     "expected": "skipped", "expected_reason": "memoire depassee"})
+    return batch
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Extraction isolee face a des PDFs pathologiques")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Delai max par fichier (s)")
+    parser.add_argument("--max-rss-mb", type=int, default=100, help="Memoire max d'un worker (Mo)")
+    parser.add_argument("--workers", type=int, default=2, help="Nombre de workers isoles")
+    parser.add_argument("--normal", type=int, default=4, help="Nombre de CVs normaux dans le lot")
+    args = parser.parse_args(argv)
+
+    batch = adversarial_batch(args.normal)
+    start = time.perf_counter()
+    documents = extract_documents_sandboxed(
+        [item["pdf_bytes"] for item in batch], max_workers=args.workers,
+        timeout=args.timeout, max_rss_mb=args.max_rss_mb
+    )
+    elapsed = time.perf_counter() - start
+
+    report = []
+    for item, document in zip(batch, documents):
+        status = "skipped" if document["skipped"] else "ok"
+        report.append({
+            "filename": item["filename"],
+            "status": status,
+            "expected": item["expected"],
+            "reason": document["reason"],
+            "reason_ok": document["reason"].startswith(item["expected_reason"]),
+            "chars": document["chars"],
+        })
+    json.dump({"seconds": round(elapsed, 2), "files": report}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+    # Code de sortie non nul si un fichier n'a pas le statut ou la raison attendus
+    return 0 if all(row["status"] == row["expected"] and row["reason_ok"] for row in report) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
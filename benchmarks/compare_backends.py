@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Comparaison des backends d'embeddings (torch / onnx / int8)
+- Latence par lot, debit
+- Accord de classement avec le backend de reference (recouvrement top-N, ecart de score)
+
+Exemple :
+    python -m benchmarks.compare_backends --size 500 --backends torch,int8,onnx
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.corpus import JOB_DESCRIPTION, generate_corpus
+from config.settings import EMBEDDING_BATCH_SIZE
+from utils.scoring import (
+    create_embeddings,
+    extract_relevant_sections,
+    rank_by_similarity,
+    stack_embeddings,
+)
+
+
+def run_backend(backend: str, sections: List[str], batch_size: int, top_n: int) -> Dict:
+    """Encode le corpus avec un backend et mesure latence et debit"""
+    start = time.perf_counter()
+    embeddings = create_embeddings(backend)
+    embeddings.embed_documents(["warmup"])
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    vectors = []
+    for offset in range(0, len(sections), batch_size):
+        batch = sections[offset:offset + batch_size]
+        step = time.perf_counter()
+        vectors.extend(embeddings.embed_documents(batch))
+        latencies.append(time.perf_counter() - step)
+
+    jd_vector = embeddings.embed_query(JOB_DESCRIPTION)
+    scores, top_idx = rank_by_similarity(jd_vector, stack_embeddings(vectors), top_n)
+    total = sum(latencies)
+    return {
+        "load_seconds": round(load_seconds, 4),
+        "encode_seconds": round(total, 4),
+        "batch_latency_mean_ms": round(1000 * float(np.mean(latencies)), 3),
+        "batch_latency_p95_ms": round(1000 * float(np.percentile(latencies, 95)), 3),
+        "texts_per_sec": round(len(sections) / total, 2) if total > 0 else None,
+        "_scores": scores,
+        "_top": top_idx,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare les backends d'embeddings")
+    parser.add_argument("--size", type=int, default=500, help="Nombre de CVs synthetiques")
+    parser.add_argument("--backends", default="torch,int8,onnx",
+                        help="Backends a comparer ; le premier sert de reference")
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--output", "-o", default="-", help="Rapport JSON ('-' = stdout)")
+    args = parser.parse_args(argv)
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    corpus = generate_corpus(args.size, with_pdf=False)
+    sections = [extract_relevant_sections(item["text"]) for item in corpus]
+
+    results = {}
+    for backend in backends:
+        try:
+            results[backend] = run_backend(backend, sections, args.batch_size, args.top_n)
+        except Exception as exc:
+            results[backend] = {"error": str(exc)}
+            print(f"Backend {backend} indisponible : {exc}", file=sys.stderr)
+
+    reference = results.get(backends[0], {})
+    for backend, result in results.items():
+        if "error" in result or "error" in reference:
+            continue
+        overlap = len(set(result["_top"].tolist()) & set(reference["_top"].tolist()))
+        delta = np.abs(result["_scores"] - reference["_scores"])
+        result["top_n_overlap"] = round(overlap / max(1, len(reference["_top"])), 4)
+        result["score_delta_mean"] = round(float(delta.mean()), 6)
+        result["score_delta_max"] = round(float(delta.max()), 6)
+
+    report = {
+        "size": args.size,
+        "top_n": args.top_n,
+        "reference": backends[0],
+        "backends": {
+            backend: {k: v for k, v in result.items() if not k.startswith("_")}
+            for backend, result in results.items()
+        },
+    }
+    payload = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(payload)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Generateur deterministe de CVs synthetiques (FR / EN)
+- Textes avec sections Competences / Experiences / Projets
+- PDFs minimaux (Helvetica, WinAnsi) lisibles par pypdf
+"""
+import random
+from typing import Dict, List
+
+FIRST_NAMES = [
+    "Camille", "Lucas", "Ines", "Hugo", "Sarah", "Yanis", "Lea", "Mehdi",
+    "Chloe", "Thomas", "Amina", "Julien", "Emma", "Karim", "Manon", "Olivier",
+]
+LAST_NAMES = [
+    "Martin", "Bernard", "Dubois", "Diallo", "Lefebvre", "Moreau", "Benali",
+    "Laurent", "Nguyen", "Garcia", "Petit", "Roux", "Fournier", "Mercier",
+]
+SKILLS = [
+    "Python", "SQL", "Spark", "Kafka", "Airflow", "dbt", "Docker", "Kubernetes",
+    "Terraform", "AWS", "GCP", "Azure", "Java", "Scala", "React", "TypeScript",
+    "Node.js", "PostgreSQL", "MongoDB", "Power BI", "Tableau", "TensorFlow",
+    "PyTorch", "scikit-learn", "Pandas", "FastAPI", "Django", "Git", "Linux",
+]
+ROLES_FR = ["Data Engineer", "Developpeur Backend", "Data Scientist", "Ingenieur DevOps",
+            "Developpeur Full Stack", "Analyste BI"]
+ROLES_EN = ["Data Engineer", "Backend Developer", "Data Scientist", "DevOps Engineer",
+            "Full Stack Developer", "BI Analyst"]
+COMPANIES = ["Capgemini", "Orange", "Thales", "Doctolib", "Criteo", "BlaBlaCar",
+             "Societe Generale", "Decathlon", "OVHcloud", "Airbus"]
+PROJECTS = [
+    "pipeline de donnees temps reel", "plateforme de recommandation",
+    "migration vers le cloud", "tableau de bord de suivi des ventes",
+    "API de scoring", "chatbot interne", "detection de fraude",
+]
+
+JOB_DESCRIPTION = (
+    "Recherche Data Engineer Python avec experience Kafka, Spark et SQL. "
+    "Connaissance d'Airflow, Docker et d'un cloud public (AWS ou GCP) appreciee."
+)
+
+
+def generate_cv_text(index: int, seed: int = 42) -> str:
+    """Genere le texte d'un CV synthetique, identique pour un (index, seed) donne"""
+    rng = random.Random(seed * 1_000_003 + index)
+    french = rng.random() < 0.6
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    role = rng.choice(ROLES_FR if french else ROLES_EN)
+    skills = rng.sample(SKILLS, rng.randint(5, 12))
+    email = f"{first.lower()}.{last.lower()}{index}@example.com"
+
+    lines = [
+        f"{first} {last}",
+        role,
+        f"{email} | +33 6 {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+        f"Paris, France" if french else "Lyon, France",
+        "",
+        "Profil" if french else "Summary",
+        (f"{role} avec {rng.randint(1, 12)} ans d'experience, oriente qualite et delivery."
+         if french else
+         f"{role} with {rng.randint(1, 12)} years of experience, focused on quality and delivery."),
+        "",
+        "Compétences" if french else "Skills",
+        ", ".join(skills[:len(skills) // 2]),
+        ", ".join(skills[len(skills) // 2:]),
+        "",
+        "Expériences" if french else "Experience",
+    ]
+    for _ in range(rng.randint(2, 4)):
+        company = rng.choice(COMPANIES)
+        start = rng.randint(2012, 2021)
+        lines.append(f"{role} - {company} ({start}-{start + rng.randint(1, 3)})")
+        lines.append(
+            f"- Conception et maintenance avec {rng.choice(skills)} et {rng.choice(skills)}"
+            if french else
+            f"- Designed and maintained services using {rng.choice(skills)} and {rng.choice(skills)}"
+        )
+    lines += ["", "Projets" if french else "Projects"]
+    for _ in range(rng.randint(1, 3)):
+        lines.append(f"- {rng.choice(PROJECTS)} ({rng.choice(skills)})")
+    lines += [
+        "",
+        "Formation" if french else "Education",
+        "Master Informatique - Universite Paris-Saclay" if french else "MSc Computer Science",
+        "",
+        "Langues" if french else "Languages",
+        "Francais, Anglais" if french else "French, English",
+    ]
+    return "\n".join(lines)
+
+
+def _escape_pdf_text(line: str) -> bytes:
+    """Encode une ligne pour une chaine litterale PDF (WinAnsi)"""
+    raw = line.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def text_to_pdf(text: str, lines_per_page: int = 50) -> bytes:
+    """Construit un PDF minimal contenant le texte, une ligne par ligne"""
+    lines = text.split("\n")
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    objects: List[bytes] = []
+    # 1: catalogue, 2: arbre des pages, 3: police, puis (page, contenu) par page
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids).encode()
+    objects.append(b"<< /Type /Pages /Kids [" + kids + b"] /Count " + str(len(pages)).encode() + b" >>")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    for page_id, page_lines in zip(page_ids, pages):
+        content = b"BT /F1 10 Tf 50 800 Td 14 TL "
+        content += b" ".join(b"(" + _escape_pdf_text(line) + b") '" for line in page_lines)
+        content += b" ET"
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents "
+            + str(page_id + 1).encode() + b" 0 R /Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        objects.append(
+            b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream"
+        )
+
+    return assemble_pdf(objects)
+
+
+def assemble_pdf(objects: List[bytes]) -> bytes:
+    """Ecrit les objets (le premier est le catalogue) avec leur table xref"""
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def generate_corpus(size: int, seed: int = 42, with_pdf: bool = True) -> List[Dict]:
+    """
+    Genere un corpus de CVs synthetiques.
+
+    Returns:
+        Liste de dicts avec 'filename', 'text' et 'pdf_bytes' (si with_pdf)
+    """
+    corpus = []
+    for i in range(size):
+        text = generate_cv_text(i, seed)
+        item = {"filename": f"CV-synthetique-{i:05d}.pdf", "text": text}
+        if with_pdf:
+            item["pdf_bytes"] = text_to_pdf(text)
+        corpus.append(item)
+    return corpus
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Verification de la detection des doublons
+- Copie exacte, meme texte remis en page, quasi-doublon (une ligne modifiee)
+- PDFs sans texte (scans) tous differents : aucun ne doit etre fusionne
+Le lot passe par le chemin de l'application (IncrementalAnalysis) et par
+celui de batch_rank (deduplicate_candidates).
+
+Exemple :
+    python -m benchmarks.duplicate_cvs
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List
+
+from benchmarks.adversarial_pdfs import single_page_pdf
+from benchmarks.corpus import generate_corpus, text_to_pdf
+from utils.dedup import deduplicate_candidates
+from utils.incremental import IncrementalAnalysis
+from utils.pdf_extractor import extract_documents_parallel
+
+
+def scanned_pdf(index: int) -> bytes:
+    """Page sans texte (dessin seul), comme un CV scanne"""
+    return single_page_pdf(f"q 0.5 g 50 50 {100 + index} 200 re f Q".encode())
+
+
+def duplicate_batch(normal: int = 4, scanned: int = 3) -> List[Dict]:
+    """Lot de CVs avec leur representant attendu apres dedoublonnage"""
+    corpus = generate_corpus(normal)
+    batch = [
+        {"filename": item["filename"], "pdf_bytes": item["pdf_bytes"], "expected": item["filename"]}
+        for item in corpus
+    ]
+    first = corpus[0]
+    lines = corpus[1]["text"].splitlines()
+    lines[-1] += " Disponible immediatement."
+    batch += [
+        {"filename": "copie.pdf", "pdf_bytes": first["pdf_bytes"], "expected": first["filename"]},
+        {"filename": "remis-en-page.pdf", "pdf_bytes": text_to_pdf(first["text"], lines_per_page=20),
+         "expected": first["filename"]},
+        {"filename": "quasi-doublon.pdf", "pdf_bytes": text_to_pdf("\n".join(lines)),
+         "expected": corpus[1]["filename"]},
+    ]
+    batch += [
+        {"filename": f"scan-{i}.pdf", "pdf_bytes": scanned_pdf(i), "expected": f"scan-{i}.pdf"}
+        for i in range(scanned)
+    ]
+    return batch
+
+
+def representatives(candidates: List[Dict]) -> Dict[str, str]:
+    """{nom de fichier: nom du fichier representant}"""
+    mapping = {}
+    for candidate in candidates:
+        mapping[candidate["filename"]] = candidate["filename"]
+        for alternate in candidate.get("alternate_filenames", []):
+            mapping[alternate] = candidate["filename"]
+    return mapping
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Detection des CVs en double")
+    parser.add_argument("--normal", type=int, default=4, help="Nombre de CVs distincts")
+    parser.add_argument("--scanned", type=int, default=3, help="Nombre de PDFs sans texte")
+    args = parser.parse_args(argv)
+
+    batch = duplicate_batch(args.normal, args.scanned)
+    expected = {item["filename"]: item["expected"] for item in batch}
+
+    session = IncrementalAnalysis()
+    session.update_files([(item["filename"], item["pdf_bytes"]) for item in batch])
+    incremental = representatives([session.candidates[key] for key in session.order])
+
+    documents = extract_documents_parallel([item["pdf_bytes"] for item in batch])
+    unique, _ = deduplicate_candidates([
+        {"filename": item["filename"], "pdf_bytes": item["pdf_bytes"], "text": document["text"]}
+        for item, document in zip(batch, documents)
+    ])
+    batch_rank = representatives(unique)
+
+    report = {
+        "incremental": {"duplicates": session.duplicates, "ok": incremental == expected},
+        "batch_rank": {"ok": batch_rank == expected},
+        "mismatches": sorted(
+            name for name in expected
+            if incremental.get(name) != expected[name] or batch_rank.get(name) != expected[name]
+        ),
+    }
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0 if not report["mismatches"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+Client Ollama partage face a une connexion par appel
+- Sonde de sante / latence
+- Latence par appel, sequentiel et en parallele, et connexions ouvertes
+- Verification des options envoyees (keep_alive, num_ctx, num_predict, num_thread)
+Sans --base-url, un serveur local imitant Ollama est demarre.
+
+Exemple :
+    python -m benchmarks.ollama_client_bench --calls 200 --concurrency 4
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from benchmarks.ollama_stub import start_stub_server
+from config.settings import OLLAMA_MODEL
+from utils.ollama_client import OllamaClient
+
+
+def fresh_connection_generate(base_url: str, model: str) -> Callable[[str], str]:
+    """Reference : une nouvelle connexion HTTP par appel (urllib)"""
+    def generate(prompt: str) -> str:
+        request = urllib.request.Request(
+            f"{base_url.rstrip('/')}/api/generate",
+            data=json.dumps({"model": model, "prompt": prompt, "stream": False}).encode("utf-8"),
+            headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read().decode("utf-8"))["response"]
+    return generate
+
+
+def measure(generate: Callable[[str], str], calls: int, concurrency: int) -> Dict:
+    """Latences par appel (ms) et debit, avec concurrency appels simultanes"""
+    latencies = []
+
+    def timed_call(i: int):
+        start = time.perf_counter()
+        generate(f"prompt {i}")
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed_call, range(calls)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "calls": calls,
+        "concurrency": concurrency,
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+        "calls_per_sec": round(calls / elapsed, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mesure le client Ollama partage")
+    parser.add_argument("--base-url", help="Serveur Ollama reel (par defaut : serveur local simule)")
+    parser.add_argument("--model", default=None, help="Modele (par defaut : OLLAMA_MODEL)")
+    parser.add_argument("--calls", type=int, default=200, help="Appels par mesure")
+    parser.add_argument("--concurrency", type=int, default=4, help="Appels simultanes")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server, base_url = start_stub_server()
+    model = args.model or (OLLAMA_MODEL if args.base_url else "stub")
+
+    client = OllamaClient(base_url, model=model, pool_size=args.concurrency)
+    report = {"base_url": base_url, "model": model, "probe": client.probe(), "results": {}}
+
+    for name, generate in (("fresh_connection", fresh_connection_generate(base_url, model)),
+                           ("pooled_client", client.generate)):
+        for concurrency in (1, args.concurrency):
+            before = server.connections if server else None
+            result = measure(generate, args.calls, concurrency)
+            if server:
+                result["connections_opened"] = server.connections - before
+            report["results"][f"{name}_x{concurrency}"] = result
+
+    if server:
+        # Options effectivement envoyees par le client partage
+        last = server.requests[-1]
+        report["sent"] = {"keep_alive": last.get("keep_alive"), "options": last.get("options")}
+        server.shutdown()
+    client.close()
+
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0 if report["probe"]["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
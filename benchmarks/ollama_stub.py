@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Serveur HTTP local imitant l'API d'Ollama (/api/generate, /api/tags)
+Permet de mesurer et tester les appels LLM sans modele ni reseau
+"""
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class OllamaStubHandler(BaseHTTPRequestHandler):
+    """Repond a /api/generate avec un texte fixe, en streaming ou non"""
+
+    # Latence simulee avant le premier fragment et entre les fragments (secondes)
+    first_token_delay = 0.0
+    token_delay = 0.0
+    # Requetes servies par connexion avant de la fermer sans prevenir le client,
+    # comme un serveur qui coupe les connexions inactives (0 = jamais)
+    requests_per_connection = 0
+    reply = "Profil pertinent : competences alignees avec le poste. Point de vigilance : a confirmer en entretien."
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # Un handler par connexion TCP : compte les connexions ouvertes par les clients
+        super().setup()
+        # Comme le serveur Go d'Ollama : pas d'algorithme de Nagle
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.connections += 1
+        self.served = 0
+
+    def handle_one_request(self):
+        super().handle_one_request()
+        self.served += 1
+        if self.requests_per_connection and self.served >= self.requests_per_connection:
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": "stub"}]})
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests.append(request)
+        if self.path != "/api/generate":
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        time.sleep(self.first_token_delay)
+        words = self.reply.split(" ")
+        stats = {
+            "done": True,
+            "prompt_eval_count": len(request.get("prompt", "")) // 4,
+            "prompt_eval_duration": int(self.first_token_delay * 1e9),
+            "eval_count": len(words),
+        }
+
+        if not request.get("stream", True):
+            self._send_json({"model": request.get("model", ""), "response": self.reply, **stats})
+            return
+
+        # Reponse en NDJSON, un mot par ligne
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.token_delay)
+            chunk = {"response": word if i == 0 else " " + word, "done": False}
+            self._write_chunk(json.dumps(chunk).encode("utf-8") + b"\n")
+        self._write_chunk(json.dumps({"response": "", **stats}).encode("utf-8") + b"\n")
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0,
+                      first_token_delay: float = 0.0, token_delay: float = 0.0,
+                      requests_per_connection: int = 0):
+    """
+    Demarre le serveur dans un thread daemon.
+    requests_per_connection > 0 : chaque connexion est fermee apres ce nombre
+    de requetes, sans en-tete "Connection: close" (connexion perimee cote client).
+
+    Returns:
+        (serveur, base_url) ; appeler serveur.shutdown() pour l'arreter.
+        serveur.connections et serveur.requests gardent les connexions et requetes recues
+    """
+    handler = type("ConfiguredStubHandler", (OllamaStubHandler,), {
+        "first_token_delay": first_token_delay,
+        "token_delay": token_delay,
+        "requests_per_connection": requests_per_connection,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.connections = 0
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark par etape du pipeline d'analyse sur un corpus synthetique
+
+Exemple :
+    python -m benchmarks.run_benchmarks --sizes 10,100,1000 --output bench.json
+    python -m benchmarks.run_benchmarks --sizes 100 --compare bench.json
+"""
+import argparse
+import hashlib
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.corpus import JOB_DESCRIPTION, generate_corpus
+from benchmarks.ollama_stub import start_stub_server
+from utils.email_extractor import extract_contacts_batch
+from utils.llm_analysis import build_analysis_prompt, ollama_generate
+from utils.pdf_extractor import extract_text_from_bytes, extract_texts_parallel
+from utils import scoring
+
+
+class HashEmbeddings:
+    """Embeddings deterministes derives d'un hash (aucun modele a charger)"""
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = []
+        for text in texts:
+            seed = int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], 16)
+            vector = np.random.default_rng(seed).standard_normal(self.dim)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def time_stage(func: Callable[[], object], items: int) -> Dict:
+    """Chronometre une etape et calcule son debit"""
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 6),
+        "items": items,
+        "items_per_sec": round(items / seconds, 2) if seconds > 0 else None,
+    }
+
+
+def run_size(size: int, seed: int, llm_base_url: str, workers: int) -> Dict:
+    """Execute toutes les etapes pour un corpus de taille donnee"""
+    corpus = generate_corpus(size, seed)
+    buffers = [item["pdf_bytes"] for item in corpus]
+    texts = [item["text"] for item in corpus]
+    results = {}
+    state = {}
+
+    results["pdf_extraction"] = time_stage(
+        lambda: state.update(texts=[extract_text_from_bytes(b) for b in buffers]), size
+    )
+    results["pdf_extraction_parallel"] = time_stage(
+        lambda: extract_texts_parallel(buffers, max_workers=workers), size
+    )
+    results["contact_extraction"] = time_stage(
+        lambda: extract_contacts_batch(texts), size
+    )
+    results["section_extraction"] = time_stage(
+        lambda: state.update(sections=[scoring.extract_relevant_sections(t) for t in texts]), size
+    )
+    results["embedding"] = time_stage(
+        lambda: state.update(
+            jd=scoring.embed_texts([JOB_DESCRIPTION])[0],
+            vectors=scoring.embed_texts(state["sections"])
+        ),
+        size + 1
+    )
+    results["ranking_cosine_loop"] = time_stage(
+        lambda: sorted(
+            (scoring.cosine_similarity(state["jd"], v) for v in state["vectors"]), reverse=True
+        ),
+        size
+    )
+
+    def rank_matrix():
+        matrix = scoring.stack_embeddings(state["vectors"])
+        _, top_idx = scoring.rank_by_similarity(state["jd"], matrix, 5)
+        state["top_idx"] = top_idx
+
+    results["ranking_matrix"] = time_stage(rank_matrix, size)
+
+    ranked = [
+        {"name": corpus[i]["filename"], "score": 0.5, "text": texts[i]}
+        for i in state["top_idx"]
+    ]
+    results["prompt_building"] = time_stage(
+        lambda: state.update(prompt=build_analysis_prompt(JOB_DESCRIPTION, ranked)), len(ranked)
+    )
+    results["llm_stub"] = time_stage(
+        lambda: ollama_generate(state["prompt"], base_url=llm_base_url), 1
+    )
+    return results
+
+
+def git_commit() -> str:
+    """Commit courant, pour comparer les rapports entre versions"""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare_reports(current: Dict, baseline: Dict) -> List[str]:
+    """Lignes de comparaison (ratio de temps courant / reference) par etape"""
+    lines = [f"{'taille':>7} {'etape':<26} {'reference':>11} {'courant':>11} {'ratio':>7}"]
+    for size, stages in current["results"].items():
+        base_stages = baseline.get("results", {}).get(size, {})
+        for stage, result in stages.items():
+            if stage not in base_stages:
+                continue
+            before, after = base_stages[stage]["seconds"], result["seconds"]
+            ratio = after / before if before else float("inf")
+            lines.append(f"{size:>7} {stage:<26} {before:>10.4f}s {after:>10.4f}s {ratio:>6.2f}x")
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark des etapes d'analyse de CVs")
+    parser.add_argument("--sizes", default="10,100,1000",
+                        help="Tailles de corpus, separees par des virgules (10 a 10000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--embeddings", choices=["hash", "model"], default="hash",
+                        help="hash : embeddings factices hors ligne ; model : EMBEDDING_MODEL reel")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Processus pour l'extraction parallele (0 = un par coeur)")
+    parser.add_argument("--output", "-o", default="-", help="Rapport JSON ('-' = stdout)")
+    parser.add_argument("--compare", help="Rapport JSON de reference a comparer")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if args.embeddings == "hash":
+        scoring._embeddings_instance = HashEmbeddings()
+
+    server, base_url = start_stub_server()
+    try:
+        report = {
+            "meta": {
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "embeddings": args.embeddings,
+                "seed": args.seed,
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": {
+                str(size): run_size(size, args.seed, base_url, args.workers) for size in sizes
+            },
+        }
+    finally:
+        server.shutdown()
+
+    payload = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(payload)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload + "\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n".join(compare_reports(report, baseline)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 """
 Configuration centralisee du projet Talk2CVs
 """
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -11,12 +12,125 @@ load_dotenv()
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_TEMPERATURE = float(os.getenv("OLLAMA_TEMPERATURE", "0.1"))
+# Affichage des recommandations au fil de la generation
+OLLAMA_STREAMING = os.getenv("OLLAMA_STREAMING", "true").lower() == "true"
+# Appels simultanes en analyse par candidat (aligner sur OLLAMA_NUM_PARALLEL du serveur)
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "300"))
+# Duree pendant laquelle Ollama garde le modele en memoire apres un appel
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Options de generation (0 = valeur par defaut du serveur / du modele)
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+OLLAMA_NUM_PREDICT = int(os.getenv("OLLAMA_NUM_PREDICT", "512"))
+OLLAMA_NUM_THREAD = int(os.getenv("OLLAMA_NUM_THREAD", "0"))
+# Connexions HTTP gardees ouvertes vers Ollama (une par appel simultane)
+OLLAMA_POOL_SIZE = int(os.getenv("OLLAMA_POOL_SIZE", str(OLLAMA_NUM_PARALLEL)))
+
+
+def _default_prompt_budget(num_ctx: int, num_predict: int) -> int:
+    """
+    Budget par defaut : num_ctx moins la place reservee a la reponse.
+    Borne a max(num_ctx // 2, 256) : un budget nul ou negatif voudrait dire
+    "pas de limite", justement quand le contexte est le plus petit.
+    """
+    if num_ctx <= 0:
+        return 3000
+    budget = num_ctx - max(num_predict, 512)
+    floor = max(num_ctx // 2, 256)
+    if budget < floor:
+        logging.getLogger(__name__).warning(
+            "OLLAMA_NUM_PREDICT=%d laisse trop peu de place au prompt dans OLLAMA_NUM_CTX=%d : "
+            "budget du prompt ramene a %d tokens", num_predict, num_ctx, floor
+        )
+        budget = floor
+    return budget
+
+
+# Budget de tokens des prompts (a garder sous la fenetre de contexte du modele,
+# reponse comprise) ; 0 = pas de limite. Comptage approximatif en caracteres / token.
+LLM_PROMPT_TOKEN_BUDGET = int(os.getenv(
+    "LLM_PROMPT_TOKEN_BUDGET", str(_default_prompt_budget(OLLAMA_NUM_CTX, OLLAMA_NUM_PREDICT))
+))
+LLM_CANDIDATE_TOKEN_BUDGET = int(os.getenv("LLM_CANDIDATE_TOKEN_BUDGET", "1000"))
+LLM_CHARS_PER_TOKEN = float(os.getenv("LLM_CHARS_PER_TOKEN", "3.5"))
+
+# Cache persistant des reponses du LLM
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_responses.sqlite")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
 
 # Configuration Embeddings
 EMBEDDING_MODEL = os.getenv(
     "EMBEDDING_MODEL",
     "sentence-transformers/all-MiniLM-L6-v2"
 )
+# Backend d'inference : torch (fp32), onnx (ONNX Runtime) ou int8 (quantifie)
+EMBEDDING_BACKENDS = ("torch", "onnx", "int8")
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+# Nombre de CVs encodes par appel au modele d'embeddings
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+# Service partage : regroupe les demandes de toutes les sessions en lots
+EMBEDDING_SERVICE_ENABLED = os.getenv("EMBEDDING_SERVICE_ENABLED", "true").lower() == "true"
+EMBEDDING_SERVICE_MAX_BATCH = int(os.getenv("EMBEDDING_SERVICE_MAX_BATCH", "64"))
+EMBEDDING_SERVICE_MAX_WAIT_MS = float(os.getenv("EMBEDDING_SERVICE_MAX_WAIT_MS", "10"))
+# Cache persistant des embeddings (desactivable)
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000"))
+
+# Extraction PDF (0 = un processus par coeur, 1 = sequentiel)
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "0"))
+# Pages lues par CV et budget de caracteres (0 = pas de limite)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "8"))
+PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "30000"))
+# Extraction isolee : delai par fichier et memoire max d'un worker (0 = sans limite)
+PDF_SANDBOX_ENABLED = os.getenv("PDF_SANDBOX_ENABLED", "true").lower() == "true"
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", "30"))
+PDF_MAX_RSS_MB = int(os.getenv("PDF_MAX_RSS_MB", "1024"))
+
+# Vivier persistant de CVs (ChromaDB)
+CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", ".cache/chroma")
+CHROMA_COLLECTION = os.getenv("CHROMA_COLLECTION", "cvs")
+TOP_K_RESULTS = int(os.getenv("TOP_K_RESULTS", "5"))
+
+# Prechauffage au demarrage de l'application
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_OLLAMA = os.getenv("WARMUP_OLLAMA", "false").lower() == "true"
+
+# Detection des CVs en double (exacts + quasi-doublons MinHash / LSH)
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_NEAR_THRESHOLD = float(os.getenv("DEDUP_NEAR_THRESHOLD", "0.9"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "64"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+DEDUP_SHINGLE_SIZE = int(os.getenv("DEDUP_SHINGLE_SIZE", "5"))
+# En dessous (texte normalise), un CV n'est compare que sur les octets du PDF
+DEDUP_MIN_TEXT_CHARS = int(os.getenv("DEDUP_MIN_TEXT_CHARS", "200"))
+
+# Prefiltre lexical (BM25) avant les embeddings, pour les grands lots de CVs
+LEXICAL_PREFILTER_ENABLED = os.getenv("LEXICAL_PREFILTER_ENABLED", "false").lower() == "true"
+LEXICAL_PREFILTER_MIN_POOL = int(os.getenv("LEXICAL_PREFILTER_MIN_POOL", "500"))
+LEXICAL_PREFILTER_TOP_K = int(os.getenv("LEXICAL_PREFILTER_TOP_K", "200"))
+# Poids du score lexical dans le score final (0 = semantique seul)
+LEXICAL_FUSION_WEIGHT = float(os.getenv("LEXICAL_FUSION_WEIGHT", "0.0"))
+
+# Index ANN (IVF) pour les grands viviers
+ANN_NLIST = int(os.getenv("ANN_NLIST", "0"))  # 0 = racine du nombre de CVs
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "8"))  # plus haut = meilleur rappel, plus lent
+ANN_EXACT_THRESHOLD = int(os.getenv("ANN_EXACT_THRESHOLD", "5000"))
+ANN_DTYPE = os.getenv("ANN_DTYPE", "float32")  # float32 ou float16
+
+# Jobs d'analyse en arriere-plan (file SQLite + pool de threads)
+JOBS_BACKGROUND_DEFAULT = os.getenv("JOBS_BACKGROUND_DEFAULT", "false").lower() == "true"
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", ".cache/jobs.sqlite")
+JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "2"))
+JOBS_RETENTION_SECONDS = float(os.getenv("JOBS_RETENTION_SECONDS", str(24 * 3600)))
+# Etats de session (PDFs, vecteurs) gardes en memoire pour les derniers jobs termines
+JOBS_MAX_SESSIONS = int(os.getenv("JOBS_MAX_SESSIONS", "8"))
+JOBS_POLL_SECONDS = float(os.getenv("JOBS_POLL_SECONDS", "1.0"))
+
+# Niveau des logs applicatifs (les temps par etape sont emis en INFO)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
 # Configuration Review & Email
 TOP_CANDIDATES = int(os.getenv("TOP_CANDIDATES", "5"))
@@ -26,7 +140,3 @@ EMAIL_BODY = """Bonjour,
 Suite a l'examen de votre candidature, nous avons le plaisir de vous informer que votre profil a ete retenu pour la prochaine etape du recrutement
 
 Cordialement,"""
-
-print(f"Configuration chargee")
-print(f"   - Modele Ollama : {OLLAMA_MODEL}")
-print(f"   - Modele Embeddings : {EMBEDDING_MODEL}")
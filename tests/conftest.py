@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+Configuration commune des tests
+Les tests importent les modules du projet (config, utils, benchmarks) depuis la racine.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
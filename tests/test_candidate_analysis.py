@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Analyse par candidat : appels en parallele borne, reponses rendues dans
+l'ordre du classement quel que soit l'ordre d'arrivee.
+"""
+import threading
+import time
+
+from utils.llm_analysis import analyze_candidates_concurrently, build_candidate_prompt
+
+JOB_DESCRIPTION = "Data scientist Python, SQL et machine learning"
+
+
+def ranked_candidates(count):
+    return [
+        {"name": f"Candidat {i}", "email": "", "score": 0.9 - i / 100,
+         "text": f"Candidat {i} : Python, SQL, {i} ans d'experience."}
+        for i in range(count)
+    ]
+
+
+def test_results_in_rank_order_with_bounded_concurrency():
+    ranked = ranked_candidates(6)
+    prompts = [build_candidate_prompt(JOB_DESCRIPTION, c, i + 1) for i, c in enumerate(ranked)]
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def generate(prompt):
+        rank = prompts.index(prompt)
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        # Les premiers du classement repondent en dernier
+        time.sleep(0.02 * (len(prompts) - rank))
+        with lock:
+            active[0] -= 1
+        return f"analyse {rank}"
+
+    arrivals = []
+    analyses = analyze_candidates_concurrently(
+        JOB_DESCRIPTION, ranked, max_concurrency=2,
+        on_result=lambda i, text: arrivals.append(i), generate=generate, prompts=prompts
+    )
+
+    assert analyses == [f"analyse {i}" for i in range(len(ranked))]
+    assert sorted(arrivals) == list(range(len(ranked)))
+    assert arrivals != sorted(arrivals)
+    assert peak[0] == 2
+
+
+def test_failed_call_does_not_block_others():
+    ranked = ranked_candidates(3)
+
+    def generate(prompt):
+        if "Candidat 1" in prompt:
+            raise TimeoutError("delai Ollama")
+        return "ok"
+
+    analyses = analyze_candidates_concurrently(JOB_DESCRIPTION, ranked, generate=generate)
+
+    assert analyses[0] == analyses[2] == "ok"
+    assert analyses[1].startswith("Analyse indisponible")
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Service d'embeddings partage : les demandes concurrentes sont regroupees en
+lots, et chaque future recoit ses propres vecteurs, dans l'ordre de ses textes.
+"""
+import threading
+
+import pytest
+
+from utils.embedding_service import EmbeddingService
+
+
+class RecordingEncoder:
+    """Encode chaque texte en [longueur, numero] et garde la taille des lots"""
+
+    def __init__(self):
+        self.batches = []
+        self.lock = threading.Lock()
+
+    def __call__(self, texts):
+        with self.lock:
+            self.batches.append(list(texts))
+        return [[float(len(text)), float(text.split("-")[-1])] for text in texts]
+
+
+def test_concurrent_requests_share_a_batch_and_resolve_in_order():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encode=encoder, max_batch=64, max_wait_ms=200)
+    requests = [[f"req{r}-{i}" for i in range(r + 1)] for r in range(5)]
+
+    futures = [service.submit(texts) for texts in requests]
+
+    for texts, future in zip(requests, futures):
+        assert future.result(timeout=5) == [
+            [float(len(text)), float(text.split("-")[-1])] for text in texts
+        ]
+    assert len(encoder.batches) == 1
+    assert service.metrics()["requests"] == len(requests)
+
+
+def test_max_batch_splits_without_reordering():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encode=encoder, max_batch=4, max_wait_ms=200)
+    requests = [[f"r{r}-{i}" for i in range(3)] for r in range(4)]
+
+    futures = [service.submit(texts) for texts in requests]
+
+    results = [future.result(timeout=5) for future in futures]
+    assert [[vector[1] for vector in result] for result in results] == [[0.0, 1.0, 2.0]] * 4
+    assert all(len(batch) <= 4 for batch in encoder.batches)
+    # Un lot trop grand est reporte en tete du suivant : l'ordre d'arrivee est garde
+    assert [text for batch in encoder.batches for text in batch] == [
+        text for texts in requests for text in texts
+    ]
+
+
+def test_empty_request_and_encoder_error():
+    def failing(texts):
+        raise RuntimeError("modele indisponible")
+
+    service = EmbeddingService(encode=failing, max_wait_ms=1)
+
+    assert service.submit([]).result(timeout=1) == []
+    with pytest.raises(RuntimeError, match="modele indisponible"):
+        service.encode(["texte"])
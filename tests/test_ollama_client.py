@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Client Ollama partage face au serveur simule : connexions reutilisees,
+nouvel essai sur une connexion perimee, options envoyees, budget des prompts.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.ollama_stub import start_stub_server
+from config.settings import _default_prompt_budget
+from utils.ollama_client import OllamaClient, generation_options
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**kwargs):
+        server, base_url = start_stub_server(**kwargs)
+        servers.append(server)
+        return server, base_url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_connections_reused_across_calls(stub):
+    server, base_url = stub()
+    client = OllamaClient(base_url, model="stub", pool_size=2)
+
+    for i in range(10):
+        assert client.generate(f"prompt {i}")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(client.generate, [f"parallele {i}" for i in range(20)]))
+    client.close()
+
+    assert len(server.requests) == 30
+    assert client.connections_opened <= 2
+    assert server.connections == client.connections_opened
+
+
+def test_stream_releases_connection(stub):
+    server, base_url = stub()
+    client = OllamaClient(base_url, model="stub", pool_size=1)
+    stats = []
+
+    text = "".join(client.stream("prompt", on_stats=stats.append))
+    client.generate("suivant")
+    client.close()
+
+    assert text == server.RequestHandlerClass.reply
+    assert stats and stats[0]["done"]
+    assert client.connections_opened == 1
+
+
+def test_stale_connection_retried_once(stub):
+    server, base_url = stub(requests_per_connection=1)
+    client = OllamaClient(base_url, model="stub", pool_size=1)
+
+    first = client.generate("premier")
+    # Laisser le serveur fermer la connexion gardee dans le pool
+    time.sleep(0.1)
+    second = client.generate("second")
+    client.close()
+
+    assert first == second
+    assert client.connections_opened == 2
+    assert [r["prompt"] for r in server.requests] == ["premier", "second"]
+
+
+def test_options_and_keep_alive_sent(stub):
+    server, base_url = stub()
+    options = generation_options(temperature=0.2, num_ctx=2048, num_predict=256, num_thread=0)
+    client = OllamaClient(base_url, model="stub", keep_alive="10m", options=options)
+
+    client.generate("prompt", num_predict=64)
+    client.close()
+
+    sent = server.requests[-1]
+    assert sent["keep_alive"] == "10m"
+    assert sent["options"] == {"temperature": 0.2, "num_ctx": 2048, "num_predict": 64}
+
+
+@pytest.mark.parametrize("num_ctx, num_predict, expected", [
+    (4096, 512, 3584),
+    (8192, 1024, 7168),
+    (2048, 2048, 1024),
+    (2048, 4096, 1024),
+    (300, 512, 256),
+    (0, 512, 3000),
+])
+def test_default_prompt_budget_stays_positive(num_ctx, num_predict, expected):
+    assert _default_prompt_budget(num_ctx, num_predict) == expected
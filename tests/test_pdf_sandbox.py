@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Extraction isolee face aux PDFs pathologiques : chaque fichier est ignore
+avec la bonne raison, et les CVs normaux du lot sont extraits malgre tout.
+"""
+from benchmarks.adversarial_pdfs import adversarial_batch, malformed_pdf, slow_pdf
+from benchmarks.corpus import generate_corpus
+from utils.pdf_extractor import extract_documents_sandboxed
+
+
+def test_adversarial_batch_skipped_with_expected_reason():
+    batch = adversarial_batch(normal=2)
+    documents = extract_documents_sandboxed(
+        [item["pdf_bytes"] for item in batch], max_workers=2, timeout=2.0, max_rss_mb=100
+    )
+
+    assert len(documents) == len(batch)
+    for item, document in zip(batch, documents):
+        assert document["skipped"] == (item["expected"] == "skipped"), item["filename"]
+        assert document["reason"].startswith(item["expected_reason"]), (
+            item["filename"], document["reason"]
+        )
+        if not document["skipped"]:
+            assert document["chars"] > 0
+
+
+def test_worker_recovers_after_timeout():
+    corpus = generate_corpus(2)
+    documents = extract_documents_sandboxed(
+        [slow_pdf(), corpus[0]["pdf_bytes"], malformed_pdf(), corpus[1]["pdf_bytes"]],
+        max_workers=1, timeout=1.0, max_rss_mb=0
+    )
+
+    assert [d["skipped"] for d in documents] == [True, False, True, False]
+    assert documents[0]["reason"].startswith("delai depasse")
+    assert documents[1]["text"].strip() and documents[3]["text"].strip()
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+Index approximatif des plus proches voisins (IVF) pour les grands viviers de CVs
+- Partitionnement k-means des embeddings normalises (similarite cosinus)
+- Recherche dans les nprobe partitions les plus proches (reglage rappel / latence)
+- Ajout et suppression incrementaux, sauvegarde / chargement sur disque
+- Recherche exacte pour les petits viviers
+"""
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import (
+    ANN_NLIST,
+    ANN_NPROBE,
+    ANN_EXACT_THRESHOLD,
+    ANN_DTYPE,
+)
+from utils.scoring import top_n_indices
+
+
+class IVFIndex:
+    """Index IVF-Flat sur des vecteurs normalises, identifies par une chaine"""
+
+    def __init__(self, dim: int, nlist: int = ANN_NLIST, nprobe: int = ANN_NPROBE,
+                 exact_threshold: int = ANN_EXACT_THRESHOLD, dtype: str = ANN_DTYPE):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.exact_threshold = exact_threshold
+        self.dtype = np.dtype(dtype)
+
+        self._vectors = np.zeros((0, dim), dtype=self.dtype)
+        self._ids: List[str] = []
+        self._meta: List[Dict] = []
+        self._alive = np.zeros(0, dtype=bool)
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._row_of: Dict[str, int] = {}
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._lists_dirty = True
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._row_of
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    # --- Construction ---
+
+    def train(self, iterations: int = 10, seed: int = 0):
+        """K-means spherique sur les vecteurs presents (partitions = nlist)"""
+        alive_rows = np.flatnonzero(self._alive)
+        if len(alive_rows) == 0:
+            return
+        data = self._vectors[alive_rows].astype(np.float32)
+        nlist = self.nlist if self.nlist > 0 else int(np.sqrt(len(data)))
+        nlist = max(1, min(nlist, len(data)))
+
+        rng = np.random.default_rng(seed)
+        centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(data @ centroids.T, axis=1)
+            for k in range(nlist):
+                members = data[assign == k]
+                if len(members):
+                    center = members.sum(axis=0)
+                    centroids[k] = center / (np.linalg.norm(center) or 1.0)
+
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self._assign = self._nearest_centroid(self._vectors)
+        self._lists_dirty = True
+
+    def add(self, ids: Sequence[str], vectors: np.ndarray,
+            metadata: Optional[Sequence[Dict]] = None):
+        """
+        Ajoute (ou remplace) des vecteurs ; les partitions existantes sont conservees.
+        Un identifiant deja indexe est remplace ; repete dans l'appel, seule sa
+        derniere occurrence est gardee (une ligne vivante par identifiant).
+        """
+        ids = list(ids)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        metadata = list(metadata) if metadata is not None else [{} for _ in ids]
+        if len(vectors) != len(ids) or len(metadata) != len(ids):
+            raise ValueError("ids, vecteurs et metadonnees doivent avoir la meme longueur")
+        last = {item_id: pos for pos, item_id in enumerate(ids)}
+        if len(last) < len(ids):
+            keep = sorted(last.values())
+            ids = [ids[pos] for pos in keep]
+            vectors = vectors[keep]
+            metadata = [metadata[pos] for pos in keep]
+        self.remove([i for i in ids if i in self._row_of])
+
+        start = len(self._ids)
+        self._vectors = np.vstack([self._vectors, vectors.astype(self.dtype)])
+        self._ids.extend(ids)
+        self._meta.extend(metadata)
+        self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+        if self.is_trained:
+            new_assign = self._nearest_centroid(vectors)
+        else:
+            new_assign = np.zeros(len(ids), dtype=np.int32)
+        self._assign = np.concatenate([self._assign, new_assign])
+        for offset, item_id in enumerate(ids):
+            self._row_of[item_id] = start + offset
+        self._lists_dirty = True
+
+    def remove(self, ids: Sequence[str]) -> int:
+        """Supprime des vecteurs par identifiant ; retourne le nombre supprime"""
+        removed = 0
+        for item_id in ids:
+            row = self._row_of.pop(item_id, None)
+            if row is not None:
+                self._alive[row] = False
+                removed += 1
+        if removed:
+            self._lists_dirty = True
+            # Compacter quand les lignes supprimees deviennent nombreuses
+            if (~self._alive).sum() > len(self._alive) // 4:
+                self._compact()
+        return removed
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive)
+        self._vectors = self._vectors[keep]
+        self._ids = [self._ids[i] for i in keep]
+        self._meta = [self._meta[i] for i in keep]
+        self._assign = self._assign[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._row_of = {item_id: row for row, item_id in enumerate(self._ids)}
+        self._lists_dirty = True
+
+    def _nearest_centroid(self, vectors: np.ndarray) -> np.ndarray:
+        if len(vectors) == 0:
+            return np.zeros(0, dtype=np.int32)
+        return np.argmax(vectors.astype(np.float32) @ self.centroids.T, axis=1).astype(np.int32)
+
+    def _inverted_lists(self) -> List[np.ndarray]:
+        if self._lists_dirty:
+            alive_rows = np.flatnonzero(self._alive)
+            order = alive_rows[np.argsort(self._assign[alive_rows], kind="stable")]
+            bounds = np.searchsorted(self._assign[order], np.arange(len(self.centroids) + 1))
+            self._lists = [order[bounds[k]:bounds[k + 1]] for k in range(len(self.centroids))]
+            self._lists_dirty = False
+        return self._lists
+
+    # --- Recherche ---
+
+    def search(self, query: Sequence[float], top_n: int,
+               nprobe: Optional[int] = None) -> List[Tuple[str, float, Dict]]:
+        """
+        Retourne les top_n voisins (id, score cosinus, metadonnees), tries par score.
+        Recherche exacte si l'index n'est pas entraine ou si le vivier est petit.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if len(self) == 0:
+            return []
+
+        if not self.is_trained or len(self) <= self.exact_threshold:
+            rows = np.flatnonzero(self._alive)
+        else:
+            probes = nprobe or self.nprobe
+            centroid_scores = self.centroids @ query
+            nearest = top_n_indices(centroid_scores, min(probes, len(self.centroids)))
+            lists = self._inverted_lists()
+            rows = np.concatenate([lists[k] for k in nearest])
+
+        scores = self._vectors[rows].astype(np.float32) @ query
+        best = top_n_indices(scores, top_n)
+        return [
+            (self._ids[rows[i]], float(scores[i]), self._meta[rows[i]])
+            for i in best
+        ]
+
+    # --- Persistance ---
+
+    def save(self, path: str):
+        """Sauvegarde l'index (vecteurs, partitions, identifiants, metadonnees)"""
+        self._compact()
+        np.savez(
+            path,
+            vectors=self._vectors,
+            assign=self._assign,
+            centroids=self.centroids if self.is_trained else np.zeros((0, self.dim), np.float32),
+            config=np.array(json.dumps({
+                "dim": self.dim, "nlist": self.nlist, "nprobe": self.nprobe,
+                "exact_threshold": self.exact_threshold, "dtype": self.dtype.name,
+                "ids": self._ids, "meta": self._meta,
+            })),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        """Recharge un index sauvegarde avec save()"""
+        with np.load(path) as data:
+            config = json.loads(str(data["config"]))
+            index = cls(config["dim"], config["nlist"], config["nprobe"],
+                        config["exact_threshold"], config["dtype"])
+            index._vectors = data["vectors"].astype(index.dtype)
+            index._assign = data["assign"].astype(np.int32)
+            if len(data["centroids"]):
+                index.centroids = data["centroids"].astype(np.float32)
+        index._ids = config["ids"]
+        index._meta = config["meta"]
+        index._alive = np.ones(len(index._ids), dtype=bool)
+        index._row_of = {item_id: row for row, item_id in enumerate(index._ids)}
+        # Index ecrit avec des identifiants repetes : seule la derniere ligne reste vivante
+        if len(index._row_of) < len(index._ids):
+            index._alive[:] = False
+            index._alive[list(index._row_of.values())] = True
+            index._compact()
+        return index
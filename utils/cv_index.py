@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Vivier persistant de CVs (ChromaDB)
+- Ingestion unique de chaque CV (texte, contacts, nom, fichier, embedding)
+- Recherche des TOP_K_RESULTS plus proches voisins d'une description de poste
+"""
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+import chromadb
+
+from config.settings import (
+    CHROMA_PERSIST_DIR,
+    CHROMA_COLLECTION,
+    TOP_K_RESULTS,
+)
+from utils.email_extractor import CONTACT_FIELDS
+from utils.scoring import embed_texts_cached, extract_relevant_sections
+
+
+# Singleton pour la collection ChromaDB
+_collection = None
+_collection_lock = threading.Lock()
+
+
+def get_cv_collection():
+    """Recupere (ou cree) la collection persistante des CVs"""
+    global _collection
+    with _collection_lock:
+        if _collection is None:
+            client = chromadb.PersistentClient(path=CHROMA_PERSIST_DIR)
+            _collection = client.get_or_create_collection(
+                name=CHROMA_COLLECTION,
+                metadata={"hnsw:space": "cosine"}
+            )
+    return _collection
+
+
+def cv_document_id(candidate: Dict) -> str:
+    """
+    Identifiant stable d'un CV, derive des octets du PDF.
+    Le texte seul ne suffit pas : tous les PDFs scannes extraient un texte vide.
+    """
+    if candidate.get("file_hash"):
+        return candidate["file_hash"]
+    if candidate.get("pdf_bytes"):
+        return hashlib.sha256(candidate["pdf_bytes"]).hexdigest()
+    return hashlib.sha256(candidate["text"].encode("utf-8")).hexdigest()
+
+
+def ingest_candidates(candidates: List[Dict]) -> int:
+    """
+    Ajoute au vivier les CVs qui n'y sont pas encore.
+
+    Args:
+        candidates: Liste de dicts avec 'name', 'text', 'filename', les champs
+                    de contact et 'pdf_bytes' (ou 'file_hash')
+
+    Returns:
+        Nombre de CVs reellement ajoutes
+    """
+    collection = get_cv_collection()
+
+    # Dedoublonner par fichier, puis ignorer les CVs deja ingeres
+    by_id = {}
+    for candidate in candidates:
+        by_id.setdefault(cv_document_id(candidate), candidate)
+    if not by_id:
+        return 0
+    existing = set(collection.get(ids=list(by_id.keys()), include=[])["ids"])
+    new_items = {doc_id: c for doc_id, c in by_id.items() if doc_id not in existing}
+    if not new_items:
+        return 0
+
+    relevant_texts = [extract_relevant_sections(c["text"]) for c in new_items.values()]
+    vectors = embed_texts_cached(relevant_texts)
+
+    collection.add(
+        ids=list(new_items.keys()),
+        embeddings=[vector.tolist() for vector in vectors],
+        documents=[c["text"] for c in new_items.values()],
+        metadatas=[
+            {"name": c["name"], "filename": c["filename"],
+             **{field: c.get(field, "") for field in CONTACT_FIELDS}}
+            for c in new_items.values()
+        ]
+    )
+    return len(new_items)
+
+
+def query_pool(job_description: str, top_k: Optional[int] = None) -> List[Dict]:
+    """
+    Recherche les CVs du vivier les plus proches d'une description de poste.
+
+    Args:
+        job_description: Texte de la description de poste
+        top_k: Nombre de voisins (TOP_K_RESULTS par defaut)
+
+    Returns:
+        Liste de candidats tries par score decroissant
+    """
+    collection = get_cv_collection()
+    count = collection.count()
+    if count == 0:
+        return []
+
+    jd_embedding = embed_texts_cached([job_description])[0]
+    result = collection.query(
+        query_embeddings=[jd_embedding.tolist()],
+        n_results=min(top_k or TOP_K_RESULTS, count),
+        include=["documents", "metadatas", "distances"]
+    )
+
+    candidates = []
+    for text, meta, distance in zip(
+        result["documents"][0], result["metadatas"][0], result["distances"][0]
+    ):
+        candidates.append({
+            "name": meta.get("name", ""),
+            **{field: meta.get(field, "") for field in CONTACT_FIELDS},
+            "text": text,
+            "filename": meta.get("filename", ""),
+            # Distance cosinus -> similarite cosinus
+            "score": 1.0 - float(distance),
+        })
+    return candidates
+
+
+def pool_size() -> int:
+    """Nombre de CVs presents dans le vivier"""
+    return get_cv_collection().count()
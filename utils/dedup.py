@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Detection des CVs en double avant le scoring
+- Doublons exacts : hash des octets du PDF et du texte extrait normalise
+- Quasi-doublons : signatures MinHash sur des shingles de mots + LSH
+- Textes trop courts (PDFs scannes, image seule) : compares sur les octets uniquement
+Chaque groupe de doublons devient un seul candidat qui garde ses autres noms de fichier.
+"""
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import (
+    DEDUP_NEAR_THRESHOLD,
+    DEDUP_NUM_PERM,
+    DEDUP_BANDS,
+    DEDUP_SHINGLE_SIZE,
+    DEDUP_MIN_TEXT_CHARS,
+)
+
+# Nombre premier de Mersenne 2^31 - 1 pour les permutations universelles
+_PRIME = (1 << 31) - 1
+
+
+def normalize_text(text: str) -> str:
+    """Minuscules et espaces compactes, pour comparer des textes extraits"""
+    return " ".join(text.lower().split())
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class MinHasher:
+    """Signatures MinHash deterministes sur des shingles de mots"""
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, shingle_size: int = DEDUP_SHINGLE_SIZE,
+                 seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        words = re.findall(r"\w+", text.lower())
+        size = self.shingle_size
+        shingles = {" ".join(words[i:i + size]) for i in range(max(1, len(words) - size + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        # (a * x + b) mod p tient dans 64 bits car a, x < 2^31
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _union(parent: List[int], i: int, j: int):
+    root_i, root_j = _find(parent, i), _find(parent, j)
+    if root_i != root_j:
+        # Le representant est toujours le premier dans l'ordre d'upload
+        parent[max(root_i, root_j)] = min(root_i, root_j)
+
+
+def find_duplicate_groups(
+    texts: List[str],
+    file_hashes: List[Optional[str]],
+    signatures: List[np.ndarray],
+    threshold: float = DEDUP_NEAR_THRESHOLD,
+    bands: int = DEDUP_BANDS,
+    min_chars: int = DEDUP_MIN_TEXT_CHARS
+) -> Tuple[List[int], Dict[str, int]]:
+    """
+    Regroupe les documents identiques ou quasi identiques.
+    Un texte normalise de moins de min_chars caracteres (PDF scanne, texte
+    vide) ne dit rien du candidat : ce document n'est fusionne que sur ses octets.
+
+    Returns:
+        (indice du representant de chaque document, compteurs
+         {'exact': doublons exacts, 'near': quasi-doublons})
+    """
+    n = len(texts)
+    parent = list(range(n))
+    counts = {"exact": 0, "near": 0}
+
+    comparable = [len(normalize_text(t)) >= min_chars for t in texts]
+    text_hashes = [text_hash(t) if ok else None for t, ok in zip(texts, comparable)]
+
+    # Doublons exacts : memes octets ou meme texte normalise
+    for keys in (file_hashes, text_hashes):
+        first_seen = {}
+        for i, key in enumerate(keys):
+            if key is None:
+                continue
+            if key in first_seen:
+                if _find(parent, i) != _find(parent, first_seen[key]):
+                    counts["exact"] += 1
+                _union(parent, i, first_seen[key])
+            else:
+                first_seen[key] = i
+
+    # Quasi-doublons : paires candidates via LSH, verifiees sur la similarite estimee
+    if n > 1 and signatures:
+        rows = max(1, len(signatures[0]) // bands)
+        buckets = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            if not comparable[i]:
+                continue
+            for band in range(bands):
+                chunk = signature[band * rows:(band + 1) * rows]
+                buckets[(band, chunk.tobytes())].append(i)
+
+        checked = set()
+        for members in buckets.values():
+            for pos, i in enumerate(members):
+                for j in members[pos + 1:]:
+                    if (i, j) in checked or _find(parent, i) == _find(parent, j):
+                        continue
+                    checked.add((i, j))
+                    similarity = float(np.mean(signatures[i] == signatures[j]))
+                    if similarity >= threshold:
+                        _union(parent, i, j)
+                        counts["near"] += 1
+
+    return [_find(parent, i) for i in range(n)], counts
+
+
+def deduplicate_candidates(candidates: List[Dict]) -> Tuple[List[Dict], Dict[str, int]]:
+    """
+    Fusionne les CVs en double ; le premier de chaque groupe est conserve
+    avec les autres noms de fichier dans 'alternate_filenames'.
+
+    Args:
+        candidates: Dicts avec 'text', 'filename' et eventuellement 'file_hash' ou 'pdf_bytes'
+
+    Returns:
+        (candidats uniques dans l'ordre d'origine, compteurs exact / near)
+    """
+    hasher = MinHasher()
+    # Sans octets ni hash de fichier, seul un texte assez long peut fusionner le CV
+    file_hashes = [
+        c.get("file_hash")
+        or (hashlib.sha256(c["pdf_bytes"]).hexdigest() if c.get("pdf_bytes") else None)
+        for c in candidates
+    ]
+    signatures = [hasher.signature(c["text"]) for c in candidates]
+    representatives, counts = find_duplicate_groups(
+        [c["text"] for c in candidates], file_hashes, signatures
+    )
+
+    unique = {}
+    for i, rep in enumerate(representatives):
+        if rep == i:
+            unique[i] = dict(candidates[i], alternate_filenames=[])
+    for i, rep in enumerate(representatives):
+        if rep != i:
+            unique[rep]["alternate_filenames"].append(candidates[i]["filename"])
+    return [unique[i] for i in sorted(unique)], counts
@@ -1,10 +1,91 @@
 # -*- coding: utf-8 -*-
 """
 Utilitaires pour l'extraction d'informations depuis les CVs
-- Email (regex)
+- Contacts (email, telephone, LinkedIn, GitHub) en une seule passe regex
 - Nom du candidat (depuis le nom de fichier)
 """
 import re
+from typing import Dict, Iterable, List, Sequence, Union
+
+CONTACT_FIELDS = ("email", "phone", "linkedin", "github")
+
+# Un seul motif compile : les URLs avant les emails, les emails avant les telephones,
+# pour que les chiffres d'une URL ou d'un email ne soient pas pris pour un numero
+_CONTACT_PATTERN = re.compile(
+    r"(?P<linkedin>(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/(?:in|pub)/[\w%-]+)"
+    r"|(?P<github>(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9](?:[A-Za-z0-9-]{0,38}))"
+    r"|(?P<email>[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,})"
+    r"|(?P<phone>(?<![\w+/.@-])(?:\+|00)?\d[\d \t().-]{7,18}\d(?![\w@]))",
+    re.IGNORECASE
+)
+
+_URL_PREFIX = re.compile(r"^(?:https?://)?(?:www\.)?", re.IGNORECASE)
+
+
+def _valid_phone(raw: str) -> bool:
+    """
+    Ecarte les suites de chiffres qui ne sont pas des numeros (annees, dates,
+    SIREN / SIRET...) : un numero national commence par un seul 0 et compte
+    10 chiffres, un numero international commence par + ou 00.
+    """
+    digits = sum(ch.isdigit() for ch in raw)
+    if raw.startswith("+"):
+        return 8 <= digits <= 15
+    if raw.startswith("00"):
+        return 10 <= digits <= 17
+    return raw.startswith("0") and digits == 10
+
+
+def _normalize(field: str, value: str) -> str:
+    if field == "phone":
+        return " ".join(value.split())
+    if field in ("linkedin", "github"):
+        return "https://" + _URL_PREFIX.sub("", value).lower().rstrip("/")
+    return value
+
+
+def extract_contacts(
+    pages: Union[str, Iterable[str]],
+    fields: Sequence[str] = CONTACT_FIELDS
+) -> Dict[str, str]:
+    """
+    Extrait les contacts d'un CV en un seul parcours du texte.
+    Le parcours s'arrete des que tous les champs demandes sont trouves,
+    le plus souvent sur la premiere page.
+
+    Args:
+        pages: Texte complet ou pages successives (generateur accepte)
+        fields: Champs recherches parmi CONTACT_FIELDS
+
+    Returns:
+        Dict {champ: premiere valeur trouvee ou chaine vide}
+    """
+    if isinstance(pages, str):
+        pages = (pages,)
+    record = {field: "" for field in fields}
+    missing = set(fields)
+
+    for page in pages:
+        for match in _CONTACT_PATTERN.finditer(page):
+            field = match.lastgroup
+            if field not in missing:
+                continue
+            value = match.group(field)
+            if field == "phone" and not _valid_phone(value):
+                continue
+            record[field] = _normalize(field, value)
+            missing.discard(field)
+            if not missing:
+                return record
+    return record
+
+
+def extract_contacts_batch(
+    documents: Iterable[Union[str, Iterable[str]]],
+    fields: Sequence[str] = CONTACT_FIELDS
+) -> List[Dict[str, str]]:
+    """Extrait les contacts de plusieurs CVs (motif compile une seule fois)"""
+    return [extract_contacts(pages, fields) for pages in documents]
 
 
 def extract_email(text: str) -> str:
@@ -17,9 +98,7 @@ def extract_email(text: str) -> str:
     Returns:
         Email trouve ou chaine vide
     """
-    pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-    match = re.search(pattern, text)
-    return match.group(0) if match else ""
+    return extract_contacts(text, ("email",))["email"]
 
 
 def extract_name_from_filename(filename: str) -> str:
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Service d'embeddings partage entre les sessions Streamlit
+- File d'attente unique pour toutes les demandes d'encodage
+- Regroupement dynamique en lots (taille max + fenetre d'attente max)
+- Futures retournees aux appelants, metriques de file et de lots
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+from config.settings import (
+    EMBEDDING_SERVICE_MAX_BATCH,
+    EMBEDDING_SERVICE_MAX_WAIT_MS,
+)
+
+
+class _EncodeRequest:
+    """Demande d'encodage en attente dans la file"""
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+
+
+class EmbeddingService:
+    """Regroupe les demandes concurrentes en lots encodes par un seul thread"""
+
+    def __init__(self, encode: Optional[Callable[[List[str]], List[List[float]]]] = None,
+                 max_batch: int = EMBEDDING_SERVICE_MAX_BATCH,
+                 max_wait_ms: float = EMBEDDING_SERVICE_MAX_WAIT_MS):
+        self._encode = encode
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[_EncodeRequest]" = queue.Queue()
+        self._carry: Optional[_EncodeRequest] = None
+        self._metrics_lock = threading.Lock()
+        self._batches = 0
+        self._texts = 0
+        self._requests = 0
+        self._last_batch = 0
+        self._largest_batch = 0
+        self._thread = threading.Thread(
+            target=self._run, name="talk2cvs-embedding-service", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Met des textes en file ; la future renvoie leurs embeddings dans l'ordre"""
+        request = _EncodeRequest(list(texts))
+        if not request.texts:
+            request.future.set_result([])
+            return request.future
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        """Version bloquante de submit()"""
+        return self.submit(texts).result()
+
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        if self._encode is not None:
+            return self._encode(texts)
+        from utils.scoring import get_embeddings
+        return get_embeddings().embed_documents(texts)
+
+    def _next_batch(self) -> List[_EncodeRequest]:
+        """Attend une demande puis regroupe les suivantes dans la fenetre d'attente"""
+        first = self._carry or self._queue.get()
+        self._carry = None
+        batch, size = [first], len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(request.texts) > self.max_batch:
+                # Trop grand pour ce lot : traite en tete du lot suivant
+                self._carry = request
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [r for r in self._next_batch() if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            texts = [text for request in batch for text in request.texts]
+            try:
+                vectors = self._encode_batch(texts)
+            except Exception as exc:
+                for request in batch:
+                    request.future.set_exception(exc)
+                continue
+
+            offset = 0
+            for request in batch:
+                count = len(request.texts)
+                request.future.set_result(vectors[offset:offset + count])
+                offset += count
+
+            with self._metrics_lock:
+                self._batches += 1
+                self._requests += len(batch)
+                self._texts += len(texts)
+                self._last_batch = len(texts)
+                self._largest_batch = max(self._largest_batch, len(texts))
+
+    def metrics(self) -> Dict:
+        """Profondeur de file et statistiques de taille des lots"""
+        with self._metrics_lock:
+            return {
+                "queue_depth": self._queue.qsize() + (1 if self._carry else 0),
+                "batches": self._batches,
+                "requests": self._requests,
+                "texts": self._texts,
+                "avg_batch_size": self._texts / self._batches if self._batches else 0.0,
+                "last_batch_size": self._last_batch,
+                "largest_batch_size": self._largest_batch,
+            }
+
+
+# Singleton pour le service
+_service_instance: Optional[EmbeddingService] = None
+_service_lock = threading.Lock()
+
+
+def get_embedding_service() -> EmbeddingService:
+    """Recupere l'instance singleton du service d'embeddings"""
+    global _service_instance
+    with _service_lock:
+        if _service_instance is None:
+            _service_instance = EmbeddingService()
+    return _service_instance
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+Etat incremental d'une session d'analyse
+- CVs deja extraits et encodes, indexes par hash du fichier
+- Embedding de la description de poste et vecteur complet des scores
+Modifier la description ne re-encode que la description, ajouter un fichier
+ne traite que ce fichier, changer top_n ne fait que re-decouper le classement.
+"""
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import DEDUP_ENABLED, LEXICAL_FUSION_WEIGHT
+from utils.dedup import MinHasher, find_duplicate_groups
+from utils.email_extractor import extract_name_from_filename
+from utils.lexical_index import fuse_scores
+from utils.pdf_extractor import extract_documents_parallel
+from utils.scoring import (
+    embed_texts_cached,
+    extract_relevant_sections,
+    match_candidates,
+    prefilter_candidates,
+    rank_by_similarity,
+    record_prefilter_savings,
+    stack_embeddings,
+    top_n_indices,
+)
+from utils.timing import StageTimer, timed, timed_count
+
+
+def file_key(pdf_bytes: bytes) -> str:
+    """Cle stable d'un fichier uploade (hash de son contenu)"""
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+class IncrementalAnalysis:
+    """Conserve entre deux analyses tout ce qui n'a pas a etre recalcule"""
+
+    def __init__(self):
+        self.candidates: Dict[str, Dict] = {}
+        self.sections: Dict[str, str] = {}
+        self.vectors: Dict[str, np.ndarray] = {}
+        self.order: List[str] = []
+        self.job_description: Optional[str] = None
+        self.jd_vector: Optional[np.ndarray] = None
+        self.scores: Optional[np.ndarray] = None
+        self.signatures: Dict[str, np.ndarray] = {}
+        self.duplicates = {"exact": 0, "near": 0}
+        # Fichiers dont l'extraction a echoue (delai, memoire, PDF illisible)
+        self.failures: Dict[str, Dict] = {}
+        self.skipped: List[Dict] = []
+        self._hasher: Optional[MinHasher] = None
+        # Pris par le pipeline : l'interface et un job peuvent partager la session
+        self.lock = threading.RLock()
+
+    def update_files(
+        self,
+        uploads: List[Tuple[str, bytes]],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        timer: Optional[StageTimer] = None
+    ) -> int:
+        """
+        Synchronise l'etat avec les fichiers uploades.
+        Les embeddings sont calcules plus tard, au classement, et seulement
+        pour les CVs qui passent le prefiltre lexical.
+
+        Args:
+            uploads: (nom de fichier, octets) dans l'ordre d'upload
+            progress_callback: Progression de l'extraction des nouveaux fichiers
+            timer: Mesure optionnelle du temps de chaque etape
+
+        Returns:
+            Nombre de fichiers nouvellement traites ; ceux dont l'extraction
+            a echoue sont listes dans self.skipped avec leur raison
+        """
+        order, new_files, filenames = [], [], {}
+        for filename, pdf_bytes in uploads:
+            key = file_key(pdf_bytes)
+            filenames.setdefault(key, []).append(filename)
+            if key in order or key in self.failures:
+                continue
+            order.append(key)
+            if key not in self.candidates:
+                new_files.append((key, filename, pdf_bytes))
+
+        if new_files:
+            buffers = [pdf_bytes for _, _, pdf_bytes in new_files]
+            with timed(timer, "pdf_extraction", len(buffers)):
+                documents = extract_documents_parallel(buffers, progress_callback=progress_callback)
+            timed_count(timer, "pages_read", sum(d["pages_read"] for d in documents))
+            timed_count(timer, "pages_skipped", sum(d["pages_skipped"] for d in documents))
+
+            # Les fichiers en echec ne sont pas re-essayes a chaque analyse
+            failed = [i for i, document in enumerate(documents) if document["skipped"]]
+            for i in failed:
+                key, filename, _ = new_files[i]
+                self.failures[key] = {"filename": filename, "reason": documents[i]["reason"]}
+                order.remove(key)
+            new_files = [f for i, f in enumerate(new_files) if i not in failed]
+            documents = [d for i, d in enumerate(documents) if i not in failed]
+            texts = [document["text"] for document in documents]
+
+            # Contacts deja extraits page par page dans les workers (temps compte
+            # dans pdf_extraction) : il ne reste qu'a assembler les fiches
+            with timed(timer, "candidate_records", len(texts)):
+                for (key, filename, pdf_bytes), text, document in zip(new_files, texts, documents):
+                    self.candidates[key] = {
+                        "name": extract_name_from_filename(filename),
+                        **document["contacts"],
+                        "text": text,
+                        "filename": filename,
+                        "pdf_bytes": pdf_bytes,
+                        "pages": {k: v for k, v in document.items() if k not in ("text", "contacts")}
+                    }
+
+            with timed(timer, "section_extraction", len(texts)):
+                for (key, _, _), text in zip(new_files, texts):
+                    self.sections[key] = extract_relevant_sections(text)
+
+        self.skipped = [self.failures[key] for key in filenames if key in self.failures]
+        timed_count(timer, "files_skipped", len(self.skipped))
+
+        # Oublier les fichiers retires de l'upload
+        for key in set(self.candidates) - set(order):
+            self.candidates.pop(key)
+            self.sections.pop(key, None)
+            self.vectors.pop(key, None)
+            self.signatures.pop(key, None)
+
+        order = self._collapse_duplicates(order, filenames, timer)
+        if order != self.order:
+            self.order = order
+            self.scores = None
+        return len(new_files)
+
+    def _collapse_duplicates(
+        self,
+        order: List[str],
+        filenames: Dict[str, List[str]],
+        timer: Optional[StageTimer] = None
+    ) -> List[str]:
+        """
+        Ne garde qu'un representant par groupe de doublons (memes octets,
+        meme texte ou quasi identique) ; les autres noms de fichier sont
+        conserves dans 'alternate_filenames'.
+        """
+        alternates = {key: names[1:] for key, names in filenames.items()}
+        self.duplicates = {"exact": sum(len(names) for names in alternates.values()), "near": 0}
+
+        if DEDUP_ENABLED and len(order) > 1:
+            with timed(timer, "deduplication", len(order)):
+                if self._hasher is None:
+                    self._hasher = MinHasher()
+                for key in order:
+                    if key not in self.signatures:
+                        self.signatures[key] = self._hasher.signature(self.candidates[key]["text"])
+                representatives, counts = find_duplicate_groups(
+                    [self.candidates[key]["text"] for key in order],
+                    order,
+                    [self.signatures[key] for key in order]
+                )
+            for i, rep in enumerate(representatives):
+                if rep != i:
+                    alternates[order[rep]] += filenames[order[i]]
+            self.duplicates["exact"] += counts["exact"]
+            self.duplicates["near"] += counts["near"]
+            order = [key for i, key in enumerate(order) if representatives[i] == i]
+
+        for key in order:
+            self.candidates[key]["alternate_filenames"] = alternates[key]
+        timed_count(timer, "duplicates_merged", self.duplicates["exact"] + self.duplicates["near"])
+        return order
+
+    def update_job(self, job_description: str, timer: Optional[StageTimer] = None) -> bool:
+        """Re-encode la description de poste seulement si elle a change"""
+        if job_description == self.job_description and self.jd_vector is not None:
+            return False
+        with timed(timer, "jd_embedding"):
+            self.jd_vector = embed_texts_cached([job_description])[0]
+        self.job_description = job_description
+        self.scores = None
+        return True
+
+    def _ensure_vectors(
+        self,
+        keys: List[str],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        timer: Optional[StageTimer] = None
+    ):
+        """Encode les CVs qui n'ont pas encore d'embedding"""
+        missing = [key for key in keys if key not in self.vectors]
+        if not missing:
+            return
+        with timed(timer, "cv_embedding", len(missing)):
+            vectors = embed_texts_cached(
+                [self.sections[key] for key in missing], progress_callback=progress_callback
+            )
+        for key, vector in zip(missing, vectors):
+            self.vectors[key] = vector
+
+    def rank(
+        self,
+        top_n: int,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        timer: Optional[StageTimer] = None
+    ) -> List[Dict]:
+        """Top_n candidats ; le vecteur de scores n'est recalcule que si necessaire"""
+        if not self.order or self.jd_vector is None:
+            return []
+        if self.scores is None:
+            keep, lexical = prefilter_candidates(
+                self.job_description, [self.sections[key] for key in self.order], timer=timer
+            )
+            kept_keys = [self.order[i] for i in keep]
+            self._ensure_vectors(kept_keys, progress_callback, timer)
+            record_prefilter_savings(timer, len(keep), len(self.order) - len(keep))
+
+            with timed(timer, "ranking", len(keep)):
+                matrix = stack_embeddings([self.vectors[key] for key in kept_keys])
+                kept_scores, _ = rank_by_similarity(self.jd_vector, matrix, 0)
+                if lexical is not None:
+                    kept_scores = fuse_scores(kept_scores, lexical[keep], LEXICAL_FUSION_WEIGHT)
+                # Les CVs elagues restent hors classement
+                self.scores = np.full(len(self.order), -np.inf, dtype=np.float32)
+                self.scores[keep] = kept_scores
+
+        return [
+            dict(self.candidates[self.order[i]], score=float(self.scores[i]))
+            for i in top_n_indices(self.scores, min(top_n, self.ranked_count()))
+        ]
+
+    def ranked_count(self) -> int:
+        """Nombre de CVs classes (hors CVs elagues par le prefiltre)"""
+        if self.scores is None:
+            return 0
+        return int(np.isfinite(self.scores).sum())
+
+    def match_roles(
+        self,
+        job_descriptions: List[str],
+        top_n: int,
+        assign: bool = False,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        timer: Optional[StageTimer] = None
+    ) -> Dict:
+        """
+        Classe tous les CVs pour plusieurs postes a la fois (sans prefiltre lexical).
+
+        Returns:
+            Dict de scoring.match_candidates ; 'best_role' suit l'ordre d'upload
+        """
+        with timed(timer, "jd_embedding", len(job_descriptions)):
+            jd_matrix = stack_embeddings(embed_texts_cached(job_descriptions))
+        self._ensure_vectors(self.order, progress_callback, timer)
+        cv_matrix = stack_embeddings([self.vectors[key] for key in self.order])
+        return match_candidates(
+            jd_matrix, cv_matrix, [self.candidates[key] for key in self.order],
+            top_n, assign, timer
+        )
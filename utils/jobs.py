@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+File de jobs d'analyse en arriere-plan
+- Jobs persistes dans SQLite : statut, etape en cours, progression, resultat
+- Execution dans un pool de threads, hors de la boucle de rerun Streamlit
+- Un rafraichissement de la page retrouve le job par son identifiant
+- Les octets des PDFs ne sont pas ecrits en base : ils sont restaures depuis
+  l'etat de session, garde en memoire pour les derniers jobs seulement (LRU)
+"""
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import (
+    JOBS_DB_PATH,
+    JOBS_MAX_WORKERS,
+    JOBS_RETENTION_SECONDS,
+    JOBS_MAX_SESSIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Etats possibles d'un job
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+ReportFn = Callable[[str, Optional[float]], None]
+
+
+def _without_pdf_bytes(value: Any) -> Any:
+    """Copie du resultat sans les octets des PDFs (un lot complet par job sinon)"""
+    if isinstance(value, dict):
+        return {k: _without_pdf_bytes(v) for k, v in value.items() if k != "pdf_bytes"}
+    if isinstance(value, list):
+        return [_without_pdf_bytes(item) for item in value]
+    return value
+
+
+def _with_pdf_bytes(value: Any, pdf_by_filename: Dict[str, bytes]) -> Any:
+    """Remet les octets des PDFs dans chaque candidat (dict avec 'filename')"""
+    if isinstance(value, dict):
+        restored = {k: _with_pdf_bytes(v, pdf_by_filename) for k, v in value.items()}
+        if value.get("filename") in pdf_by_filename:
+            restored["pdf_bytes"] = pdf_by_filename[value["filename"]]
+        return restored
+    if isinstance(value, list):
+        return [_with_pdf_bytes(item, pdf_by_filename) for item in value]
+    return value
+
+
+class JobQueue:
+    """Jobs executes par un pool de threads, suivis dans une base SQLite locale"""
+
+    def __init__(self, path: str = JOBS_DB_PATH, max_workers: int = JOBS_MAX_WORKERS,
+                 retention_seconds: float = JOBS_RETENTION_SECONDS,
+                 max_sessions: int = JOBS_MAX_SESSIONS):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        # Objets non serialisables (etat de session) gardes en memoire seulement,
+        # pour les max_sessions derniers jobs termines
+        self._extras: "OrderedDict[str, Dict]" = OrderedDict()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " label TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " stage TEXT NOT NULL DEFAULT '',"
+            " progress REAL,"
+            " error TEXT NOT NULL DEFAULT '',"
+            " result BLOB,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL)"
+        )
+        # Les jobs d'un processus precedent ne reprendront jamais
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?)",
+            (JOB_FAILED, "interrompu par un redemarrage", time.time(), JOB_QUEUED, JOB_RUNNING)
+        )
+        self._conn.commit()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="analysis-job"
+        )
+
+    def _update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id)
+            )
+            self._conn.commit()
+
+    def submit(self, fn: Callable[[Dict, ReportFn], Dict], params: Dict, label: str = "") -> str:
+        """
+        Met un job en file et retourne aussitot son identifiant.
+
+        Args:
+            fn: Fonction (params, report) -> resultat ; report(etape, progression 0-1 ou None)
+            params: Parametres passes tels quels a fn (peuvent contenir des octets)
+            label: Libelle affiche dans l'interface
+        """
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            expired = self._conn.execute(
+                "SELECT id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (now - self.retention_seconds,)
+            ).fetchall()
+            for (expired_id,) in expired:
+                self._extras.pop(expired_id, None)
+            self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (now - self.retention_seconds,)
+            )
+            self._conn.execute(
+                "INSERT INTO jobs (id, label, status, stage, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, label, JOB_QUEUED, "En attente", now)
+            )
+            self._conn.commit()
+        self._executor.submit(self._run, job_id, fn, params)
+        return job_id
+
+    def _run(self, job_id: str, fn: Callable[[Dict, ReportFn], Dict], params: Dict):
+        self._update(job_id, status=JOB_RUNNING, stage="Demarrage", started_at=time.time())
+
+        def report(stage: str, progress: Optional[float] = None):
+            self._update(job_id, stage=stage, progress=progress)
+
+        try:
+            result = fn(params, report)
+        except Exception as exc:
+            logger.exception("Job %s en echec", job_id)
+            self._update(job_id, status=JOB_FAILED, error=str(exc), finished_at=time.time())
+            return
+
+        extras = {key: result.pop(key) for key in ("session",) if result.get(key) is not None}
+        if extras:
+            with self._lock:
+                self._extras[job_id] = extras
+                while len(self._extras) > max(0, self.max_sessions):
+                    self._extras.popitem(last=False)
+        self._update(
+            job_id, status=JOB_DONE, stage="Termine", progress=1.0,
+            result=pickle.dumps(_without_pdf_bytes(result)), finished_at=time.time()
+        )
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Statut, etape et progression d'un job (None s'il n'existe plus)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, label, status, stage, progress, error, created_at, started_at,"
+                " finished_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("id", "label", "status", "stage", "progress", "error",
+                "created_at", "started_at", "finished_at")
+        return dict(zip(keys, row))
+
+    def result(self, job_id: str) -> Optional[Dict]:
+        """
+        Resultat d'un job termine. Si l'etat de session est encore en memoire,
+        il est joint au resultat et les octets des PDFs sont restaures.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM jobs WHERE id = ? AND status = ?", (job_id, JOB_DONE)
+            ).fetchone()
+            extras = self._extras.get(job_id, {})
+            if extras:
+                self._extras.move_to_end(job_id)
+        if row is None or row[0] is None:
+            return None
+        result = pickle.loads(row[0])
+        session = extras.get("session")
+        if session is not None:
+            pdf_by_filename = {
+                c["filename"]: c["pdf_bytes"] for c in session.candidates.values()
+                if c.get("pdf_bytes")
+            }
+            result = _with_pdf_bytes(result, pdf_by_filename)
+        return dict(result, **extras)
+
+    def queue_depth(self) -> int:
+        """Nombre de jobs en attente ou en cours"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (JOB_QUEUED, JOB_RUNNING)
+            ).fetchone()[0]
+
+
+# Singleton pour la file de jobs
+_queue_instance: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Recupere l'instance singleton de la file de jobs"""
+    global _queue_instance
+    with _queue_lock:
+        if _queue_instance is None:
+            _queue_instance = JobQueue()
+    return _queue_instance
+
+
+def run_analysis_job(params: Dict, report: ReportFn) -> Dict:
+    """
+    Job d'analyse : le pipeline du bouton "Analyser", sans interface.
+
+    Args:
+        params: Parametres de run_analysis, plus 'session' (etat incremental
+                de la session Streamlit, ou None pour un etat neuf)
+        report: Callback (etape, progression) pour le suivi dans l'interface
+
+    Returns:
+        Dict pret a charger dans les cles review_* de la session Streamlit
+    """
+    from utils.pipeline import run_analysis
+    return run_analysis(params, session=params.get("session"), report=report)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Index inverse BM25 sur les sections pertinentes des CVs
+- Prefiltre lexical avant l'etape d'embeddings (garde les top K)
+- Fusion optionnelle des scores lexical et semantique
+"""
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import List, Tuple
+
+import numpy as np
+
+# Mots vides FR / EN ignores dans les requetes et les documents
+STOPWORDS = {
+    "a", "au", "aux", "avec", "ce", "ces", "dans", "de", "des", "du", "en", "et",
+    "la", "le", "les", "leur", "ou", "par", "pour", "sur", "un", "une", "d", "l",
+    "an", "and", "as", "at", "for", "in", "is", "of", "on", "or", "the", "to", "with",
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Minuscules, sans accents, tokens techniques conserves (c++, node.js, c#)"""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(ch for ch in normalized if not unicodedata.combining(ch))
+    return [t for t in _TOKEN_PATTERN.findall(normalized) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Index BM25 en memoire, un document par CV"""
+
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(texts)
+
+        postings = defaultdict(lambda: ([], []))
+        doc_len = np.zeros(self.size, dtype=np.float32)
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_len[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                docs, tfs = postings[term]
+                docs.append(doc_id)
+                tfs.append(tf)
+
+        avgdl = float(doc_len.mean()) if self.size else 0.0
+        # Normalisation de longueur precalculee par document
+        self._norm = k1 * (1 - b + b * doc_len / avgdl) if avgdl else np.full(self.size, k1)
+        self._postings = {
+            term: (np.asarray(docs, dtype=np.int64), np.asarray(tfs, dtype=np.float32))
+            for term, (docs, tfs) in postings.items()
+        }
+
+    def idf(self, term: str) -> float:
+        df = len(self._postings[term][0]) if term in self._postings else 0
+        return float(np.log(1 + (self.size - df + 0.5) / (df + 0.5)))
+
+    def score(self, query: str) -> np.ndarray:
+        """Score BM25 de chaque document pour la requete"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            if term not in self._postings:
+                continue
+            docs, tfs = self._postings[term]
+            scores[docs] += self.idf(term) * tfs * (self.k1 + 1) / (tfs + self._norm[docs])
+        return scores
+
+
+def lexical_prefilter(query: str, texts: List[str], top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Garde les top_k documents les plus proches lexicalement de la requete.
+
+    Returns:
+        (indices conserves dans l'ordre d'origine, scores BM25 de tous les documents)
+    """
+    scores = BM25Index(texts).score(query)
+    if top_k >= len(texts):
+        return np.arange(len(texts)), scores
+    keep = np.argpartition(-scores, top_k - 1)[:top_k]
+    return np.sort(keep), scores
+
+
+def fuse_scores(semantic: np.ndarray, lexical: np.ndarray, weight: float) -> np.ndarray:
+    """
+    Melange score semantique (cosinus) et lexical (BM25 ramene a [0, 1]).
+    weight = 0 : semantique seul ; weight = 1 : lexical seul.
+    """
+    if weight <= 0 or len(lexical) == 0:
+        return semantic
+    top = float(lexical.max())
+    lexical_norm = lexical / top if top > 0 else lexical
+    return (1 - weight) * semantic + weight * lexical_norm
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+"""
+Analyse des candidats retenus par le LLM (Ollama)
+- Construction du prompt recruteur dans un budget de tokens partage entre candidats
+- Generation bloquante ou en streaming, avec mesure des temps
+- Analyse par candidat, en parallele borne, via le client HTTP partage d'Ollama
+"""
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.settings import (
+    OLLAMA_MODEL,
+    OLLAMA_BASE_URL,
+    OLLAMA_TEMPERATURE,
+    OLLAMA_NUM_PARALLEL,
+    LLM_PROMPT_TOKEN_BUDGET,
+    LLM_CANDIDATE_TOKEN_BUDGET,
+    LLM_CHARS_PER_TOKEN,
+)
+from utils.ollama_client import get_ollama_client
+from utils.scoring import extract_relevant_sections
+
+
+def estimate_tokens(text: str) -> int:
+    """Nombre approximatif de tokens (sans tokenizer : caracteres / LLM_CHARS_PER_TOKEN)"""
+    return math.ceil(len(text) / LLM_CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Coupe le texte a max_tokens environ, de preference en fin de ligne ou de mot"""
+    max_chars = int(max_tokens * LLM_CHARS_PER_TOKEN)
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    # Reculer jusqu'a une coupure naturelle si elle est proche
+    for separator in ("\n", " "):
+        position = cut.rfind(separator)
+        if position >= max_chars * 0.8:
+            return cut[:position].rstrip()
+    return cut
+
+
+def share_budget(sizes: List[int], budget: int) -> List[int]:
+    """
+    Repartit un budget entre plusieurs textes : chacun recoit au plus sa taille,
+    ce que les textes courts n'utilisent pas revient aux plus longs.
+    """
+    shares = [0] * len(sizes)
+    remaining = max(budget, 0)
+    order = sorted(range(len(sizes)), key=sizes.__getitem__)
+    for position, i in enumerate(order):
+        shares[i] = min(sizes[i], remaining // (len(sizes) - position))
+        remaining -= shares[i]
+    return shares
+
+
+def candidate_excerpts(
+    job_description: str,
+    ranked: List[Dict],
+    render: Callable[[str, List[str]], str],
+    token_budget: int
+) -> Tuple[str, List[str]]:
+    """
+    Sections pertinentes de chaque CV, tronquees pour que le prompt rendu
+    tienne dans token_budget (0 = sections completes).
+    Si le gabarit fixe (en-tete de chaque candidat) depasse deja le budget,
+    les derniers du classement sont retires du prompt, puis la description
+    est raccourcie.
+
+    Args:
+        render: Fonction (description, extraits) -> prompt complet ; ne doit
+                rendre que les candidats qui ont un extrait
+
+    Returns:
+        (description eventuellement tronquee, extraits dans l'ordre du classement,
+         un par candidat garde dans le prompt)
+    """
+    sections = [extract_relevant_sections(c["text"]).strip() for c in ranked]
+    if token_budget <= 0:
+        return job_description, sections
+
+    # La description ne prend jamais plus d'un tiers du budget
+    job_description = truncate_to_tokens(job_description, token_budget // 3)
+    count = len(sections)
+    fixed = estimate_tokens(render(job_description, [""] * count))
+    while count > 1 and fixed > token_budget:
+        count -= 1
+        fixed = estimate_tokens(render(job_description, [""] * count))
+    if fixed > token_budget:
+        job_description = truncate_to_tokens(
+            job_description, max(0, estimate_tokens(job_description) - (fixed - token_budget))
+        )
+        fixed = estimate_tokens(render(job_description, [""] * count))
+
+    sections = sections[:count]
+    shares = share_budget([estimate_tokens(text) for text in sections], token_budget - fixed)
+    return job_description, [
+        truncate_to_tokens(text, share) if share else ""
+        for text, share in zip(sections, shares)
+    ]
+
+
+def _analysis_prompt(job_description: str, ranked: List[Dict], excerpts: List[str]) -> str:
+    # Seuls les candidats qui ont un extrait figurent dans le prompt (voir candidate_excerpts)
+    candidates_summary = ""
+    for i, (c, excerpt) in enumerate(zip(ranked, excerpts)):
+        score_pct = int(c["score"] * 100)
+        candidates_summary += (
+            f"\n--- Candidat {i+1}: {c['name']} (Score: {score_pct}%) ---\n"
+            f"{excerpt}\n"
+        )
+
+    return f"""Tu es un assistant recruteur. Voici une description de poste et les candidats retenus.
+
+DESCRIPTION DU POSTE :
+{job_description}
+
+CANDIDATS SELECTIONNES (tries par pertinence) :
+{candidates_summary}
+
+Pour chaque candidat, explique en 2-3 lignes :
+1. Pourquoi il correspond au poste
+2. Ses points forts par rapport a la description
+3. Un point de vigilance eventuel
+
+Sois concis et precis."""
+
+
+def build_analysis_prompt(
+    job_description: str,
+    ranked: List[Dict],
+    token_budget: int = LLM_PROMPT_TOKEN_BUDGET
+) -> str:
+    """
+    Construit le prompt d'analyse pour les candidats retenus.
+    Le budget de tokens est partage entre les candidats : prompt borne quel que soit top_n.
+    """
+    def render(description, excerpts):
+        return _analysis_prompt(description, ranked, excerpts)
+
+    job_description, excerpts = candidate_excerpts(job_description, ranked, render, token_budget)
+    return render(job_description, excerpts)
+
+
+def _stats_callback(on_stats: Optional[Callable[[Dict], None]]):
+    """Convertit le corps final d'Ollama en generation_stats avant de le transmettre"""
+    return (lambda body: on_stats(generation_stats(body))) if on_stats else None
+
+
+def run_llm(
+    llm,
+    prompt: str,
+    on_stats: Optional[Callable[[Dict], None]] = None
+) -> Tuple[str, Dict]:
+    """
+    Appel bloquant au LLM.
+
+    Args:
+        llm: Client exposant generate() (OllamaClient)
+        prompt: Prompt complet
+        on_stats: Recoit les compteurs du serveur (voir generation_stats)
+
+    Returns:
+        (texte genere, temps {'ttft', 'total'} en secondes)
+    """
+    start = time.perf_counter()
+    text = llm.generate(prompt, on_stats=_stats_callback(on_stats))
+    total = time.perf_counter() - start
+    # Sans streaming, le premier token arrive avec la reponse complete
+    return text, {"ttft": total, "total": total}
+
+
+def stream_llm(
+    llm,
+    prompt: str,
+    on_token: Optional[Callable[[str], None]] = None,
+    on_stats: Optional[Callable[[Dict], None]] = None
+) -> Tuple[str, Dict]:
+    """
+    Appel au LLM en streaming.
+
+    Args:
+        llm: Client exposant stream() (OllamaClient)
+        prompt: Prompt complet
+        on_token: Appele avec le texte cumule a chaque nouveau fragment
+        on_stats: Recoit les compteurs du dernier fragment (voir generation_stats)
+
+    Returns:
+        (texte genere, temps {'ttft', 'total'} en secondes)
+    """
+    start = time.perf_counter()
+    ttft = None
+    text = ""
+    for chunk in llm.stream(prompt, on_stats=_stats_callback(on_stats)):
+        if not chunk:
+            continue
+        if ttft is None:
+            ttft = time.perf_counter() - start
+        text += chunk
+        if on_token:
+            on_token(text)
+    total = time.perf_counter() - start
+    return text, {"ttft": ttft if ttft is not None else total, "total": total}
+
+
+def build_candidate_prompt(
+    job_description: str,
+    candidate: Dict,
+    rank: int,
+    token_budget: int = LLM_CANDIDATE_TOKEN_BUDGET
+) -> str:
+    """Construit un prompt court pour l'analyse d'un seul candidat, dans token_budget"""
+    def render(description, excerpts):
+        return _candidate_prompt(description, candidate, rank, excerpts[0])
+
+    job_description, excerpts = candidate_excerpts(
+        job_description, [candidate], render, token_budget
+    )
+    return render(job_description, excerpts)
+
+
+def _candidate_prompt(job_description: str, candidate: Dict, rank: int, excerpt: str) -> str:
+    score_pct = int(candidate["score"] * 100)
+    return f"""Tu es un assistant recruteur. Voici une description de poste et un candidat.
+
+DESCRIPTION DU POSTE :
+{job_description}
+
+CANDIDAT {rank}: {candidate['name']} (Score: {score_pct}%)
+{excerpt}
+
+Explique en 2-3 lignes :
+1. Pourquoi il correspond au poste
+2. Ses points forts par rapport a la description
+3. Un point de vigilance eventuel
+
+Sois concis et precis."""
+
+
+def ollama_generate(
+    prompt: str,
+    base_url: str = OLLAMA_BASE_URL,
+    model: str = OLLAMA_MODEL,
+    temperature: float = OLLAMA_TEMPERATURE,
+    on_stats: Optional[Callable[[Dict], None]] = None
+) -> str:
+    """
+    Appel non streame a l'endpoint /api/generate d'Ollama, via le client partage
+    (connexions keep-alive, keep_alive et options de generation des settings).
+    on_stats recoit les compteurs renvoyes par le serveur (voir generation_stats).
+    """
+    return get_ollama_client(base_url).generate(
+        prompt,
+        on_stats=_stats_callback(on_stats),
+        model=model,
+        temperature=temperature
+    )
+
+
+def generation_stats(body: Dict) -> Dict:
+    """Tokens du prompt et temps de lecture du prompt / de generation (secondes)"""
+    return {
+        "prompt_tokens": body.get("prompt_eval_count", 0),
+        "prompt_eval_seconds": body.get("prompt_eval_duration", 0) / 1e9,
+        "eval_tokens": body.get("eval_count", 0),
+        "eval_seconds": body.get("eval_duration", 0) / 1e9,
+    }
+
+
+def record_prompt_stats(timer, prompt_tokens: int, stats: List[Dict]):
+    """
+    Reporte dans le timer les tokens de prompt (estimes) et le temps de lecture
+    du prompt mesure par Ollama (absent pour les reponses en cache).
+    """
+    if timer is None:
+        return
+    timer.count("prompt_tokens", prompt_tokens)
+    if stats:
+        timer.record(
+            "llm_prompt_eval",
+            sum(item["prompt_eval_seconds"] for item in stats),
+            sum(item["prompt_tokens"] for item in stats)
+        )
+
+
+def analyze_candidates_concurrently(
+    job_description: str,
+    ranked: List[Dict],
+    max_concurrency: int = OLLAMA_NUM_PARALLEL,
+    on_result: Optional[Callable[[int, str], None]] = None,
+    generate: Callable[[str], str] = ollama_generate,
+    prompts: Optional[List[str]] = None
+) -> List[str]:
+    """
+    Analyse chaque candidat avec son propre prompt, en parallele borne.
+
+    Args:
+        job_description: Texte de la description de poste
+        ranked: Candidats retenus, tries par score
+        max_concurrency: Nombre d'appels simultanes (aligne sur OLLAMA_NUM_PARALLEL)
+        on_result: Appele dans le thread appelant des qu'une reponse arrive,
+                   avec (index du candidat, texte)
+        generate: Fonction prompt -> texte (ollama_generate par defaut)
+        prompts: Prompts deja construits (un par candidat), sinon construits ici
+
+    Returns:
+        Analyses dans l'ordre du classement
+    """
+    analyses = [""] * len(ranked)
+    if not ranked:
+        return analyses
+
+    if prompts is None:
+        prompts = [
+            build_candidate_prompt(job_description, c, i + 1)
+            for i, c in enumerate(ranked)
+        ]
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        futures = {executor.submit(generate, prompt): i for i, prompt in enumerate(prompts)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                analyses[i] = future.result()
+            except Exception as exc:
+                # Un appel en echec ne bloque pas les autres candidats
+                analyses[i] = f"Analyse indisponible ({exc})"
+            if on_result:
+                on_result(i, analyses[i])
+
+    return analyses
+
+
+def format_candidate_analyses(ranked: List[Dict], analyses: List[str]) -> str:
+    """Assemble les analyses par candidat en un seul texte markdown"""
+    return "\n\n".join(
+        f"**{i + 1}. {c['name']}**\n\n{analysis}"
+        for i, (c, analysis) in enumerate(zip(ranked, analyses))
+    )
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Cache persistant des reponses du LLM (SQLite)
+- Cle : modele + temperature + options de generation (num_ctx, num_predict) + hash du prompt
+- Expiration (TTL) et eviction LRU bornee en nombre d'entrees
+- Compteurs de hits / misses
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from config.settings import (
+    OLLAMA_MODEL,
+    OLLAMA_TEMPERATURE,
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_TTL_SECONDS,
+)
+
+
+# Options qui changent la reponse (num_thread ne change que la vitesse)
+_KEY_OPTIONS = ("num_ctx", "num_predict")
+
+
+def make_llm_cache_key(prompt: str, model: str = OLLAMA_MODEL,
+                       temperature: float = OLLAMA_TEMPERATURE,
+                       options: Optional[Dict] = None) -> str:
+    """
+    Construit la cle de cache a partir du modele, de la temperature, des options
+    de generation et du prompt : relever num_predict ne sert plus de reponses
+    tronquees par l'ancien plafond.
+
+    Args:
+        options: Options envoyees a Ollama (celles du client partage par defaut)
+    """
+    if options is None:
+        from utils.ollama_client import get_ollama_client
+        options = get_ollama_client().options
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    tuned = "|".join(f"{name}={options.get(name, 0)}" for name in _KEY_OPTIONS)
+    return f"{model}|{temperature}|{tuned}|{prompt_hash}"
+
+
+class LLMResponseCache:
+    """Cache cle -> reponse texte stocke dans une base SQLite locale"""
+
+    def __init__(self, path: str = LLM_CACHE_PATH,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = LLM_CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_used"
+            " ON responses(last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Retourne la reponse en cache si elle existe et n'a pas expire"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                self._conn.execute(
+                    "UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+                self.hits += 1
+                return row[0]
+            if row:
+                # Entree expiree
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: str):
+        """Enregistre une reponse puis applique l'expiration et l'eviction LRU"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            excess = count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    " SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)",
+                    (excess,)
+                )
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Retourne les compteurs du cache"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": size,
+            "max_entries": self.max_entries,
+        }
+
+
+# Singleton pour le cache
+_cache_instance: Optional[LLMResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Recupere l'instance singleton du cache de reponses LLM"""
+    global _cache_instance
+    with _cache_lock:
+        if _cache_instance is None:
+            _cache_instance = LLMResponseCache()
+    return _cache_instance
+
+
+def cached_generate(generate: Callable[[str], str],
+                    refresh: bool = False) -> Callable[[str], str]:
+    """
+    Enveloppe une fonction prompt -> texte avec le cache de reponses.
+    refresh : ne pas lire le cache, mais y enregistrer la nouvelle reponse.
+    """
+    cache = get_llm_cache()
+
+    def wrapper(prompt: str) -> str:
+        key = make_llm_cache_key(prompt)
+        response = None if refresh else cache.get(key)
+        if response is None:
+            response = generate(prompt)
+            cache.put(key, response)
+        return response
+
+    return wrapper
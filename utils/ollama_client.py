@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Client HTTP partage pour Ollama
+- Connexions keep-alive reutilisees (pool borne) au lieu d'une connexion par appel
+- keep_alive et options de generation (num_ctx, num_predict, num_thread) centralises
+- Generation bloquante ou en streaming, sonde de sante / latence
+"""
+import http.client
+import json
+import queue
+import socket
+import threading
+import time
+from typing import Callable, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+from config.settings import (
+    OLLAMA_MODEL,
+    OLLAMA_BASE_URL,
+    OLLAMA_TEMPERATURE,
+    OLLAMA_TIMEOUT,
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_NUM_CTX,
+    OLLAMA_NUM_PREDICT,
+    OLLAMA_NUM_THREAD,
+    OLLAMA_POOL_SIZE,
+)
+
+# Erreurs d'une connexion fermee par le serveur entre deux appels : on reessaie une fois
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected, http.client.CannotSendRequest,
+    BrokenPipeError, ConnectionResetError,
+)
+
+
+class OllamaError(RuntimeError):
+    """Reponse en erreur de l'API Ollama"""
+
+
+def generation_options(
+    temperature: float = OLLAMA_TEMPERATURE,
+    num_ctx: int = OLLAMA_NUM_CTX,
+    num_predict: int = OLLAMA_NUM_PREDICT,
+    num_thread: int = OLLAMA_NUM_THREAD
+) -> Dict:
+    """Options envoyees a Ollama ; les valeurs a 0 laissent le defaut du modele"""
+    options = {"temperature": temperature}
+    for name, value in (("num_ctx", num_ctx), ("num_predict", num_predict),
+                        ("num_thread", num_thread)):
+        if value > 0:
+            options[name] = value
+    return options
+
+
+class OllamaClient:
+    """Client Ollama a connexions persistantes, partageable entre threads"""
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, model: str = OLLAMA_MODEL,
+                 timeout: float = OLLAMA_TIMEOUT, keep_alive: str = OLLAMA_KEEP_ALIVE,
+                 options: Optional[Dict] = None, pool_size: int = OLLAMA_POOL_SIZE):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.options = options if options is not None else generation_options()
+        self._host = parts.hostname or "localhost"
+        self._port = parts.port
+        self._https = parts.scheme == "https"
+        self._prefix = parts.path.rstrip("/")
+        self._pool: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(
+            maxsize=max(1, pool_size)
+        )
+        self.connections_opened = 0
+
+    # --- Pool de connexions ---
+
+    def _acquire(self) -> http.client.HTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            self.connections_opened += 1
+            connection_class = (http.client.HTTPSConnection if self._https
+                                else http.client.HTTPConnection)
+            connection = connection_class(self._host, self._port, timeout=self.timeout)
+            connection.connect()
+            # Petites requetes JSON : pas d'attente de l'algorithme de Nagle
+            connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return connection
+
+    def _release(self, connection: http.client.HTTPConnection):
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _request(self, method: str, path: str, payload: Optional[Dict] = None):
+        """Envoie la requete ; retourne (connexion, reponse) a liberer apres lecture"""
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        for attempt in range(2):
+            connection = self._acquire()
+            try:
+                connection.request(method, self._prefix + path, body=body, headers=headers)
+                response = connection.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                connection.close()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                connection.close()
+                raise
+            if response.status >= 400:
+                detail = response.read().decode("utf-8", errors="replace")
+                self._release(connection)
+                raise OllamaError(f"Ollama {path} : HTTP {response.status} {detail[:200]}")
+            return connection, response
+
+    def _json(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        connection, response = self._request(method, path, payload)
+        try:
+            data = json.loads(response.read().decode("utf-8"))
+        except Exception:
+            connection.close()
+            raise
+        self._release(connection)
+        return data
+
+    def _payload(self, prompt: str, stream: bool, **overrides) -> Dict:
+        options = dict(self.options)
+        options.update({k: v for k, v in overrides.items() if k != "model" and v is not None})
+        return {
+            "model": overrides.get("model") or self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": options,
+        }
+
+    # --- API ---
+
+    def generate(self, prompt: str, on_stats: Optional[Callable[[Dict], None]] = None,
+                 **overrides) -> str:
+        """
+        Generation non streamee.
+
+        Args:
+            prompt: Prompt complet
+            on_stats: Recoit le corps final (prompt_eval_count, eval_count, durees...)
+            overrides: model ou options de generation propres a cet appel
+        """
+        body = self._json("POST", "/api/generate", self._payload(prompt, False, **overrides))
+        if on_stats:
+            on_stats(body)
+        return body["response"]
+
+    def stream(self, prompt: str, on_stats: Optional[Callable[[Dict], None]] = None,
+               **overrides) -> Iterator[str]:
+        """Generation en streaming : produit les fragments de texte au fil de l'eau"""
+        connection, response = self._request(
+            "POST", "/api/generate", self._payload(prompt, True, **overrides)
+        )
+        complete = False
+        try:
+            for line in response:
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+                if chunk.get("done"):
+                    if on_stats:
+                        on_stats(chunk)
+                    break
+            # Vider la reponse pour pouvoir reutiliser la connexion
+            response.read()
+            complete = True
+        finally:
+            if complete:
+                self._release(connection)
+            else:
+                # Generateur abandonne ou erreur : la connexion est dans un etat inconnu
+                connection.close()
+
+    def invoke(self, prompt: str) -> str:
+        """Meme interface que les LLMs LangChain"""
+        return self.generate(prompt)
+
+    def preload(self):
+        """Charge le modele en memoire cote Ollama (requete sans prompt)"""
+        self._json("POST", "/api/generate",
+                   {"model": self.model, "keep_alive": self.keep_alive, "stream": False})
+
+    def probe(self) -> Dict:
+        """
+        Sonde de sante : joignabilite, latence de /api/tags et presence du modele.
+
+        Returns:
+            Dict {'ok', 'latency_ms', 'model_available', 'models', 'error'}
+        """
+        start = time.perf_counter()
+        try:
+            data = self._json("GET", "/api/tags")
+        except Exception as exc:
+            return {
+                "ok": False, "latency_ms": (time.perf_counter() - start) * 1000,
+                "model_available": False, "models": [], "error": str(exc),
+            }
+        models = [model.get("name", "") for model in data.get("models", [])]
+        # "mistral" correspond a "mistral:latest"
+        available = any(name == self.model or name.split(":")[0] == self.model for name in models)
+        return {
+            "ok": True, "latency_ms": (time.perf_counter() - start) * 1000,
+            "model_available": available, "models": models, "error": "",
+        }
+
+    def close(self):
+        """Ferme les connexions inactives du pool"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# Un client par URL de serveur, partage par toutes les sessions
+_clients: Dict[str, OllamaClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_ollama_client(base_url: str = OLLAMA_BASE_URL) -> OllamaClient:
+    """Recupere le client partage pour base_url"""
+    with _clients_lock:
+        if base_url not in _clients:
+            _clients[base_url] = OllamaClient(base_url)
+    return _clients[base_url]
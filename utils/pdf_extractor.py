@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+Extraction du texte des CVs PDF
+- Lecture page par page (generateur) avec plafond de pages et de caracteres
+- Extraction unitaire depuis les octets du fichier, avec stats de lecture ;
+  les contacts sont cherches au fil des pages, pendant la lecture
+- Extraction parallele d'un lot de fichiers (pool de processus)
+- Workers isoles avec delai et memoire max par fichier : un PDF pathologique
+  est ignore avec une raison, le reste du lot continue
+"""
+import io
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.connection import wait
+from typing import Callable, Dict, Iterator, List, Optional
+
+from pypdf import PdfReader
+
+from config.settings import (
+    PDF_EXTRACTION_WORKERS,
+    PDF_MAX_PAGES,
+    PDF_MAX_CHARS,
+    PDF_SANDBOX_ENABLED,
+    PDF_TIMEOUT_SECONDS,
+    PDF_MAX_RSS_MB,
+)
+from utils.email_extractor import CONTACT_FIELDS, extract_contacts
+
+# Intervalle de surveillance des workers isoles (delai, memoire)
+SANDBOX_POLL_SECONDS = 0.05
+
+
+def iter_pdf_pages(
+    pdf_bytes: bytes,
+    max_pages: int = PDF_MAX_PAGES,
+    max_chars: int = PDF_MAX_CHARS,
+    stats: Optional[Dict] = None
+) -> Iterator[str]:
+    """
+    Produit le texte des pages une par une, sans parser les pages suivantes
+    tant qu'elles ne sont pas demandees.
+
+    Args:
+        pdf_bytes: Octets du PDF
+        max_pages: Nombre maximum de pages lues (0 = toutes)
+        max_chars: Budget de caracteres ; la derniere page est tronquee (0 = illimite)
+        stats: Dict rempli au fil de la lecture (pages_total, pages_read,
+               pages_skipped, chars, truncated)
+
+    Yields:
+        Texte de chaque page lue
+    """
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    total = len(reader.pages)
+    stats = stats if stats is not None else {}
+    stats.update(pages_total=total, pages_read=0, pages_skipped=total, chars=0, truncated=False)
+
+    limit = min(total, max_pages) if max_pages > 0 else total
+    for index in range(limit):
+        text = reader.pages[index].extract_text() or ""
+        if max_chars > 0 and stats["chars"] + len(text) >= max_chars:
+            text = text[:max_chars - stats["chars"]]
+            stats["truncated"] = True
+        stats["pages_read"] += 1
+        stats["pages_skipped"] = total - stats["pages_read"]
+        stats["chars"] += len(text)
+        yield text
+        if stats["truncated"]:
+            return
+    stats["truncated"] = limit < total
+
+
+def extract_document(
+    pdf_bytes: bytes,
+    max_pages: int = PDF_MAX_PAGES,
+    max_chars: int = PDF_MAX_CHARS
+) -> Dict:
+    """
+    Texte, contacts et stats de lecture d'un PDF
+    ({'text', 'contacts', 'pages_read', 'pages_skipped', 'contact_pages', ...}).
+    Les contacts sont extraits du generateur de pages : le balayage regex
+    s'arrete a la premiere page ou tous sont trouves ; les pages suivantes
+    sont lues ensuite pour le texte complet (scoring).
+    """
+    stats, pages = {}, []
+
+    def read_pages() -> Iterator[str]:
+        for page in iter_pdf_pages(pdf_bytes, max_pages, max_chars, stats):
+            pages.append(page)
+            yield page
+
+    reader = read_pages()
+    contacts = extract_contacts(reader)
+    stats["contact_pages"] = len(pages)
+    for _ in reader:
+        pass
+    return dict(stats, text="\n".join(pages), contacts=contacts, skipped=False, reason="")
+
+
+def skipped_document(reason: str) -> Dict:
+    """Resultat d'un fichier ignore : texte vide et raison de l'echec"""
+    return {
+        "pages_total": 0, "pages_read": 0, "pages_skipped": 0, "chars": 0,
+        "truncated": False, "contact_pages": 0, "text": "",
+        "contacts": {field: "" for field in CONTACT_FIELDS}, "skipped": True, "reason": reason,
+    }
+
+
+def _safe_extract(pdf_bytes: bytes) -> Dict:
+    """extract_document qui transforme une exception en fichier ignore"""
+    try:
+        return extract_document(pdf_bytes)
+    except Exception as exc:
+        return skipped_document(f"{type(exc).__name__}: {exc}")
+
+
+def extract_text_from_bytes(pdf_bytes: bytes) -> str:
+    """Extrait le texte brut d'un PDF a partir de ses octets"""
+    return extract_document(pdf_bytes)["text"]
+
+
+def resolve_workers(max_workers: int = PDF_EXTRACTION_WORKERS) -> int:
+    """Nombre de processus a utiliser (0 = un par coeur)"""
+    if max_workers <= 0:
+        return os.cpu_count() or 1
+    return max_workers
+
+
+def _rss_mb(pid: int) -> float:
+    """Memoire residente d'un processus en Mo (0 si /proc n'est pas disponible)"""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _process_context():
+    """
+    Contexte des processus d'extraction : forkserver (ou spawn), jamais fork.
+    Streamlit tourne avec des threads (service d'embeddings, prechauffage, jobs,
+    tornado) : un verrou tenu au moment du fork bloquerait l'enfant.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        # Le serveur importe pypdf une fois, pas le script principal (Streamlit)
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def _limit_memory(max_rss_mb: int):
+    """
+    Plafonne l'espace d'adresses du worker a sa taille actuelle + max_rss_mb :
+    une allocation brutale echoue aussitot (MemoryError), la ou la
+    surveillance de /proc arriverait trop tard (Unix uniquement).
+    """
+    if max_rss_mb <= 0:
+        return
+    try:
+        import resource
+        with open("/proc/self/statm") as f:
+            baseline = int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+        limit = baseline + max_rss_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, OSError, ValueError):
+        pass
+
+
+def _sandbox_loop(conn, max_pages: int, max_chars: int, max_rss_mb: int):
+    """Boucle d'un worker isole : un PDF recu, un resultat renvoye"""
+    _limit_memory(max_rss_mb)
+    while True:
+        try:
+            pdf_bytes = conn.recv()
+        except EOFError:
+            return
+        if pdf_bytes is None:
+            return
+        try:
+            result = extract_document(pdf_bytes, max_pages, max_chars)
+        except MemoryError:
+            result = skipped_document(f"memoire depassee (> {max_rss_mb} Mo)")
+        except Exception as exc:
+            result = skipped_document(f"{type(exc).__name__}: {exc}")
+        conn.send(result)
+
+
+class _SandboxWorker:
+    """Processus d'extraction reutilise tant qu'il respecte les limites"""
+
+    def __init__(self, context, max_pages: int, max_chars: int, max_rss_mb: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_sandbox_loop, args=(child_conn, max_pages, max_chars, max_rss_mb), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.index: Optional[int] = None
+        self.started = 0.0
+
+    def submit(self, index: int, pdf_bytes: bytes):
+        self.index = index
+        self.started = time.monotonic()
+        self.conn.send(pdf_bytes)
+
+    def check(self, timeout: float, max_rss_mb: int) -> Optional[Dict]:
+        """Resultat du fichier en cours, ou None s'il est toujours en traitement"""
+        if self.conn.poll():
+            try:
+                return self.conn.recv()
+            except (EOFError, OSError):
+                return skipped_document(f"worker arrete (code {self.process.exitcode})")
+        if not self.process.is_alive():
+            return skipped_document(f"worker arrete (code {self.process.exitcode})")
+        reason = None
+        if timeout > 0 and time.monotonic() - self.started > timeout:
+            reason = f"delai depasse ({timeout:g} s)"
+        elif max_rss_mb > 0:
+            rss = _rss_mb(self.process.pid)
+            if rss > max_rss_mb:
+                reason = f"memoire depassee ({rss:.0f} Mo > {max_rss_mb} Mo)"
+        if reason is None:
+            return None
+        self.close(kill=True)
+        return skipped_document(reason)
+
+    def close(self, kill: bool = False):
+        if self.conn.closed:
+            return
+        if not kill:
+            try:
+                self.conn.send(None)
+                self.process.join(timeout=1)
+            except (OSError, ValueError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def extract_documents_sandboxed(
+    pdf_buffers: List[bytes],
+    max_workers: int = PDF_EXTRACTION_WORKERS,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    timeout: float = PDF_TIMEOUT_SECONDS,
+    max_rss_mb: int = PDF_MAX_RSS_MB,
+    max_pages: int = PDF_MAX_PAGES,
+    max_chars: int = PDF_MAX_CHARS
+) -> List[Dict]:
+    """
+    Extrait les PDFs dans des processus isoles et surveilles.
+    Un worker qui depasse le delai ou la memoire max est tue puis remplace ;
+    son fichier est marque 'skipped' avec la raison, les autres continuent.
+
+    Args:
+        pdf_buffers: Octets de chaque PDF, dans l'ordre d'upload
+        max_workers: Nombre de workers (0 = un par coeur)
+        progress_callback: Appele apres chaque fichier avec (fichiers traites, total)
+        timeout: Delai max par fichier en secondes (0 = sans limite)
+        max_rss_mb: Memoire max d'un worker en Mo (0 = sans limite, Unix) : plafond
+                    de l'espace d'adresses dans le worker + surveillance de /proc
+
+    Returns:
+        Resultats de extract_document, dans le meme ordre que pdf_buffers
+    """
+    total = len(pdf_buffers)
+    documents: List[Optional[Dict]] = [None] * total
+    if not total:
+        return documents
+
+    context = _process_context()
+    pending = deque(enumerate(pdf_buffers))
+    idle = [_SandboxWorker(context, max_pages, max_chars, max_rss_mb)
+            for _ in range(min(resolve_workers(max_workers), total))]
+    busy: List[_SandboxWorker] = []
+    done = 0
+
+    try:
+        while pending or busy:
+            while pending and idle:
+                worker = idle.pop()
+                worker.submit(*pending.popleft())
+                busy.append(worker)
+
+            wait([worker.conn for worker in busy], timeout=SANDBOX_POLL_SECONDS)
+            for worker in list(busy):
+                result = worker.check(timeout, max_rss_mb)
+                if result is None:
+                    continue
+                documents[worker.index] = result
+                busy.remove(worker)
+                if worker.process.is_alive():
+                    idle.append(worker)
+                elif pending:
+                    # Le worker tue ou mort est remplace par un neuf
+                    idle.append(_SandboxWorker(context, max_pages, max_chars, max_rss_mb))
+                done += 1
+                if progress_callback:
+                    progress_callback(done, total)
+    finally:
+        for worker in idle + busy:
+            worker.close(kill=worker in busy)
+
+    return documents
+
+
+def extract_documents_parallel(
+    pdf_buffers: List[bytes],
+    max_workers: int = PDF_EXTRACTION_WORKERS,
+    progress_callback: Optional[Callable[[int, int], None]] = None
+) -> List[Dict]:
+    """
+    Extrait le texte de plusieurs PDFs en parallele.
+    Avec PDF_SANDBOX_ENABLED, chaque fichier est surveille (delai, memoire).
+
+    Args:
+        pdf_buffers: Octets de chaque PDF, dans l'ordre d'upload
+        max_workers: Nombre de processus (0 = un par coeur, 1 = sequentiel)
+        progress_callback: Appele apres chaque fichier avec (fichiers traites, total)
+
+    Returns:
+        Resultats de extract_document, dans le meme ordre que pdf_buffers ;
+        les fichiers en echec ont 'skipped' a True et une 'reason'
+    """
+    if PDF_SANDBOX_ENABLED:
+        return extract_documents_sandboxed(pdf_buffers, max_workers, progress_callback)
+
+    total = len(pdf_buffers)
+    workers = min(resolve_workers(max_workers), total)
+    documents = [None] * total
+
+    # Pas de pool pour un seul fichier ou un seul worker
+    if workers <= 1:
+        for i, pdf_bytes in enumerate(pdf_buffers):
+            documents[i] = _safe_extract(pdf_bytes)
+            if progress_callback:
+                progress_callback(i + 1, total)
+        return documents
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_process_context()) as executor:
+        futures = {
+            executor.submit(_safe_extract, pdf_bytes): i
+            for i, pdf_bytes in enumerate(pdf_buffers)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            documents[futures[future]] = future.result()
+            if progress_callback:
+                progress_callback(done, total)
+
+    return documents
+
+
+def extract_texts_parallel(
+    pdf_buffers: List[bytes],
+    max_workers: int = PDF_EXTRACTION_WORKERS,
+    progress_callback: Optional[Callable[[int, int], None]] = None
+) -> List[str]:
+    """Comme extract_documents_parallel, mais ne retourne que les textes"""
+    documents = extract_documents_parallel(pdf_buffers, max_workers, progress_callback)
+    return [document["text"] for document in documents]
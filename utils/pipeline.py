@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline d'analyse commun au bouton "Analyser" et aux jobs d'arriere-plan
+- Vivier persistant, ou upload traite par l'etat incremental de la session
+- Classement pour un poste, ou pour plusieurs postes en une passe
+- Analyse LLM globale (bloquante ou streamee) ou par candidat
+L'interface ne fait que brancher ses callbacks (progression, cartes, streaming).
+"""
+import hashlib
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+ReportFn = Callable[[str, Optional[float]], None]
+
+
+def job_hash(job_description: str) -> str:
+    """Empreinte de la description de poste, pour rattacher un resultat a l'etat de session"""
+    return hashlib.sha256(job_description.encode("utf-8")).hexdigest()
+
+
+def select_role_candidates(roles: Dict) -> List[Dict]:
+    """Candidats retenus pour au moins un poste, avec leur meilleur poste, par score"""
+    best_by_file = {c["filename"]: c for c in roles["best_role"]}
+    selected = {c["filename"] for ranking in roles["rankings"] for c in ranking}
+    return sorted((best_by_file[f] for f in selected), key=lambda c: c["score"], reverse=True)
+
+
+def _analyze_per_candidate(
+    params: Dict,
+    ranked: List[Dict],
+    timer,
+    report: ReportFn,
+    on_answer: Optional[Callable[[int, str], None]]
+) -> Tuple[str, Dict]:
+    """Un prompt court par candidat, en parallele borne"""
+    from utils.llm_analysis import (
+        analyze_candidates_concurrently, build_candidate_prompt, estimate_tokens,
+        format_candidate_analyses, ollama_generate, record_prompt_stats,
+    )
+    from utils.llm_cache import cached_generate
+
+    job_description = params["job_description"]
+    with timer.stage("prompt_building", len(ranked)):
+        prompts = [build_candidate_prompt(job_description, c, i + 1) for i, c in enumerate(ranked)]
+    # Compteurs d'Ollama collectes par les threads, reportes ensuite dans le timer
+    generation_stats: List[Dict] = []
+    generate = cached_generate(
+        lambda prompt: ollama_generate(prompt, on_stats=generation_stats.append),
+        # Cache ignore en lecture mais rafraichi, comme pour la synthese globale
+        refresh=bool(params.get("bypass_llm_cache"))
+    )
+    start = time.perf_counter()
+    answered: List[float] = []
+
+    def on_result(i, text):
+        answered.append(time.perf_counter() - start)
+        report("Analyse par le LLM", len(answered) / len(ranked))
+        if on_answer:
+            on_answer(i, text)
+
+    analyses = analyze_candidates_concurrently(
+        job_description, ranked, on_result=on_result, generate=generate, prompts=prompts
+    )
+    total = time.perf_counter() - start
+    record_prompt_stats(timer, sum(estimate_tokens(prompt) for prompt in prompts), generation_stats)
+    llm_timings = {"ttft": answered[0] if answered else total, "total": total}
+    return format_candidate_analyses(ranked, analyses), llm_timings
+
+
+def _analyze_global(
+    params: Dict,
+    ranked: List[Dict],
+    timer,
+    on_token: Optional[Callable[[str], None]]
+) -> Tuple[str, Dict]:
+    """Synthese de tous les candidats en un seul prompt, avec cache de reponses"""
+    from utils.llm_analysis import (
+        build_analysis_prompt, estimate_tokens, record_prompt_stats, run_llm, stream_llm,
+    )
+    from utils.llm_cache import get_llm_cache, make_llm_cache_key
+    from utils.ollama_client import get_ollama_client
+
+    # Client partage : connexions keep-alive, modele garde en memoire entre analyses
+    llm = get_ollama_client()
+    with timer.stage("prompt_building", len(ranked)):
+        prompt = build_analysis_prompt(params["job_description"], ranked)
+    llm_cache = get_llm_cache()
+    cache_key = make_llm_cache_key(prompt)
+    # Ignorer le cache = regenerer et rafraichir l'entree
+    cached = None if params.get("bypass_llm_cache") else llm_cache.get(cache_key)
+    generation_stats: List[Dict] = []
+
+    if cached is not None:
+        analysis, llm_timings = cached, {"ttft": 0.0, "total": 0.0}
+    elif params.get("stream") and on_token:
+        analysis, llm_timings = stream_llm(
+            llm, prompt, on_token=on_token, on_stats=generation_stats.append
+        )
+    else:
+        analysis, llm_timings = run_llm(llm, prompt, on_stats=generation_stats.append)
+
+    if cached is None:
+        llm_cache.put(cache_key, analysis)
+    record_prompt_stats(timer, estimate_tokens(prompt), generation_stats)
+    return analysis, llm_timings
+
+
+def run_analysis(
+    params: Dict,
+    session=None,
+    report: Optional[ReportFn] = None,
+    on_ranked: Optional[Callable[[List[Dict]], None]] = None,
+    on_answer: Optional[Callable[[int, str], None]] = None,
+    on_token: Optional[Callable[[str], None]] = None
+) -> Dict:
+    """
+    Analyse complete : extraction, classement, LLM.
+
+    Args:
+        params: job_description, job_descriptions (multi-postes ou None),
+                uploads [(nom, octets)], use_pool, top_n, assign, analysis_mode
+                ('global' ou 'candidate'), stream, bypass_llm_cache, save_to_pool
+        session: Etat incremental a mettre a jour (IncrementalAnalysis) ;
+                 un nouvel etat est cree si None
+        report: Callback (etape, progression 0-1 ou None) pour le suivi
+        on_ranked: Appele avec le classement juste avant l'analyse LLM
+        on_answer: Appele avec (index, texte) des qu'une analyse par candidat arrive
+        on_token: Texte cumule de la synthese globale si params['stream']
+
+    Returns:
+        Dict candidates, analysis, roles, skipped, cache_stats, llm_timings,
+        llm_cache_stats, timings, counters, session, top_n et job_hash
+        (parametres avec lesquels le classement a ete decoupe)
+
+    Raises:
+        ValueError: Aucun CV a classer (vivier vide ou fichiers illisibles)
+    """
+    from utils.embedding_cache import get_embedding_cache
+    from utils.llm_cache import get_llm_cache
+    from utils.timing import StageTimer
+
+    report = report or (lambda stage, progress=None: None)
+    job_description = params["job_description"]
+    top_n = params["top_n"]
+    timer = StageTimer()
+    cache = get_embedding_cache()
+    hits_before, misses_before = cache.hits, cache.misses
+    roles, skipped = None, []
+
+    if params["use_pool"]:
+        from utils.cv_index import query_pool
+        report("Recherche dans le vivier de CVs", None)
+        with timer.stage("pool_query"):
+            ranked = query_pool(job_description)[:top_n]
+    else:
+        if session is None:
+            from utils.incremental import IncrementalAnalysis
+            session = IncrementalAnalysis()
+
+        def on_batch(done, total):
+            report("Calcul des embeddings", done / total)
+
+        # Une meme session peut etre partagee par l'interface et un job
+        with session.lock:
+            session.update_files(
+                params["uploads"], timer=timer,
+                progress_callback=lambda done, total: report("Extraction des CVs", done / total)
+            )
+            skipped = list(session.skipped)
+
+            if params.get("job_descriptions"):
+                # Tous les postes contre tous les CVs en une passe, sans analyse LLM
+                job_descriptions = params["job_descriptions"]
+                report(f"Classement pour {len(job_descriptions)} postes", None)
+                roles = session.match_roles(
+                    job_descriptions, top_n, assign=params.get("assign", False),
+                    progress_callback=on_batch, timer=timer
+                )
+                roles["titles"] = [jd.splitlines()[0][:80] for jd in job_descriptions]
+                ranked = select_role_candidates(roles)
+            else:
+                report("Calcul des scores de pertinence", None)
+                session.update_job(job_description, timer=timer)
+                ranked = session.rank(top_n, progress_callback=on_batch, timer=timer)
+
+            if params.get("save_to_pool"):
+                from utils.cv_index import ingest_candidates
+                report("Ajout des CVs au vivier", None)
+                ingest_candidates([session.candidates[key] for key in session.order])
+
+    if not ranked:
+        raise ValueError("Aucun CV a classer (vivier vide ou fichiers illisibles).")
+
+    # Multi-postes : pas d'analyse LLM, donc pas de temps LLM a afficher
+    llm_analysis, llm_timings = "", None
+    if roles is None:
+        report("Analyse par le LLM", 0.0)
+        if on_ranked:
+            on_ranked(ranked)
+        if params.get("analysis_mode") == "candidate":
+            llm_analysis, llm_timings = _analyze_per_candidate(
+                params, ranked, timer, report, on_answer
+            )
+        else:
+            llm_analysis, llm_timings = _analyze_global(params, ranked, timer, on_token)
+        timer.record("llm_ttft", llm_timings["ttft"])
+        timer.record("llm_total", llm_timings["total"], len(ranked))
+
+    return {
+        "candidates": ranked,
+        "analysis": llm_analysis,
+        "roles": roles,
+        "skipped": skipped,
+        "cache_stats": {"hits": cache.hits - hits_before, "misses": cache.misses - misses_before},
+        "llm_timings": llm_timings,
+        "llm_cache_stats": get_llm_cache().stats(),
+        "timings": timer.as_dict(),
+        "counters": dict(timer.counters),
+        "session": session,
+        "top_n": top_n,
+        "job_hash": job_hash(job_description),
+    }
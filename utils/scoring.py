@@ -5,28 +5,82 @@ Utilise la similarite cosinus entre embeddings
 Embede uniquement les sections pertinentes (competences, projets, experiences)
 """
 import re
-from typing import List, Dict
+import threading
+from typing import Callable, List, Dict, Optional, Sequence, Tuple
 import numpy as np
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from config.settings import EMBEDDING_MODEL
+from config.settings import (
+    EMBEDDING_MODEL,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_SERVICE_ENABLED,
+    EMBEDDING_BACKEND,
+    EMBEDDING_BACKENDS,
+    LEXICAL_PREFILTER_ENABLED,
+    LEXICAL_PREFILTER_MIN_POOL,
+    LEXICAL_PREFILTER_TOP_K,
+    LEXICAL_FUSION_WEIGHT,
+)
+from utils.embedding_cache import get_embedding_cache, make_cache_key
+from utils.embedding_service import get_embedding_service
+from utils.lexical_index import fuse_scores, lexical_prefilter
+from utils.timing import StageTimer, timed, timed_count
 
 
 # Singleton pour le modele d'embeddings
 _embeddings_instance = None
+_embeddings_lock = threading.Lock()
+
+
+def create_embeddings(backend: str = EMBEDDING_BACKEND):
+    """
+    Construit le modele d'embeddings pour le backend demande.
+
+    Args:
+        backend: 'torch' (fp32 PyTorch), 'onnx' (ONNX Runtime via
+                 sentence-transformers) ou 'int8' (PyTorch quantifie dynamiquement)
+    """
+    # Import differe : langchain / sentence-transformers / torch sont lourds
+    from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(
+            f"Backend d'embeddings inconnu : {backend} (attendu : {', '.join(EMBEDDING_BACKENDS)})"
+        )
+
+    model_kwargs = {'device': 'cpu'}
+    if backend == "onnx":
+        model_kwargs['backend'] = 'onnx'
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        model_kwargs=model_kwargs,
+        encode_kwargs={'normalize_embeddings': True}
+    )
+
+    if backend == "int8":
+        import torch
+        # Les couches lineaires passent en int8, les activations restent en float
+        embeddings.client = torch.quantization.quantize_dynamic(
+            embeddings.client, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return embeddings
 
 
 def get_embeddings():
     """Recupere l'instance singleton du modele d'embeddings"""
     global _embeddings_instance
     if _embeddings_instance is None:
-        _embeddings_instance = HuggingFaceEmbeddings(
-            model_name=EMBEDDING_MODEL,
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
+        with _embeddings_lock:
+            if _embeddings_instance is None:
+                _embeddings_instance = create_embeddings(EMBEDDING_BACKEND)
     return _embeddings_instance
 
 
+def embedding_cache_namespace(backend: str = EMBEDDING_BACKEND) -> str:
+    """Espace de cle du cache : les vecteurs different d'un backend a l'autre"""
+    return f"{EMBEDDING_MODEL}@{backend}"
+
+
 def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
     """Calcule la similarite cosinus entre deux vecteurs"""
     a = np.array(vec_a)
@@ -34,6 +88,55 @@ def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
     return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
 
 
+def stack_embeddings(vectors: Sequence) -> np.ndarray:
+    """Empile des vecteurs dans une matrice float32 contigue (une ligne par CV)"""
+    if len(vectors) == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.ascontiguousarray(np.vstack(vectors), dtype=np.float32)
+
+
+def top_n_indices(scores: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    Indices des top_n meilleurs scores, tries par score decroissant.
+    Utilise argpartition pour eviter un tri complet du vecteur.
+    """
+    total = len(scores)
+    top_n = max(0, min(top_n, total))
+    if top_n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if top_n < total:
+        candidates_idx = np.argpartition(-scores, top_n - 1)[:top_n]
+    else:
+        candidates_idx = np.arange(total)
+    # Tri stable : a score egal, l'ordre d'upload est conserve
+    order = np.argsort(-scores[candidates_idx], kind="stable")
+    return candidates_idx[order]
+
+
+def rank_by_similarity(
+    jd_embedding: Sequence[float],
+    cv_matrix: np.ndarray,
+    top_n: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score tous les CVs en un seul produit matrice-vecteur.
+    Les embeddings etant normalises, le produit scalaire est la similarite cosinus.
+
+    Args:
+        jd_embedding: Embedding normalise de la description de poste
+        cv_matrix: Matrice (n_cvs, dim) d'embeddings normalises
+        top_n: Nombre de candidats a retenir
+
+    Returns:
+        (vecteur complet des scores, indices des top_n tries par score decroissant)
+    """
+    if cv_matrix.shape[0] == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+    jd_vector = np.asarray(jd_embedding, dtype=np.float32)
+    scores = cv_matrix @ jd_vector
+    return scores, top_n_indices(scores, top_n)
+
+
 def extract_relevant_sections(text: str) -> str:
     """
     Extrait les sections pertinentes d'un CV (competences, projets, experiences).
@@ -109,10 +212,150 @@ def extract_relevant_sections(text: str) -> str:
     return result
 
 
+def embed_texts(
+    texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    progress_callback: Optional[Callable[[int, int], None]] = None
+) -> List[List[float]]:
+    """
+    Encode une liste de textes par lots avec le modele d'embeddings.
+
+    Args:
+        texts: Textes a encoder
+        batch_size: Nombre de textes par appel au modele
+        progress_callback: Appele apres chaque lot avec (textes traites, total)
+
+    Returns:
+        Liste des embeddings, dans l'ordre des textes
+    """
+    batch_size = max(1, batch_size)
+    total = len(texts)
+    vectors = []
+    batches = [texts[start:start + batch_size] for start in range(0, total, batch_size)]
+
+    if EMBEDDING_SERVICE_ENABLED:
+        # Tous les lots partent dans la file partagee, qui les regroupe
+        # avec ceux des autres sessions
+        service = get_embedding_service()
+        futures = [service.submit(batch) for batch in batches]
+        done = 0
+        for batch, future in zip(batches, futures):
+            vectors.extend(future.result())
+            done += len(batch)
+            if progress_callback:
+                progress_callback(done, total)
+        return vectors
+
+    embeddings = get_embeddings()
+    done = 0
+    for batch in batches:
+        vectors.extend(embeddings.embed_documents(batch))
+        done += len(batch)
+        if progress_callback:
+            progress_callback(done, total)
+
+    return vectors
+
+
+def embed_texts_cached(
+    texts: List[str],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    use_cache: bool = EMBEDDING_CACHE_ENABLED
+) -> List[np.ndarray]:
+    """
+    Comme embed_texts, mais ne calcule que les textes absents du cache disque.
+    Le progress_callback ne porte que sur les textes reellement encodes.
+    """
+    if not use_cache:
+        vectors = embed_texts(texts, batch_size, progress_callback)
+        return [np.asarray(v, dtype=np.float32) for v in vectors]
+
+    cache = get_embedding_cache()
+    namespace = embedding_cache_namespace()
+    keys = [make_cache_key(text, namespace) for text in texts]
+    cached = cache.get_many(keys)
+
+    # Encoder une seule fois chaque texte manquant (doublons inclus)
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+
+    if missing:
+        vectors = embed_texts(list(missing.values()), batch_size, progress_callback)
+        computed = {
+            key: np.asarray(vector, dtype=np.float32)
+            for key, vector in zip(missing.keys(), vectors)
+        }
+        cache.put_many(computed)
+        cached.update(computed)
+    elif progress_callback:
+        progress_callback(len(texts), len(texts))
+
+    return [cached[key] for key in keys]
+
+
+def embed_candidates(
+    candidates: List[Dict],
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    timer: Optional[StageTimer] = None
+) -> np.ndarray:
+    """
+    Encode les sections pertinentes de chaque CV.
+
+    Returns:
+        Matrice float32 (n_candidats, dim), une ligne par candidat
+    """
+    # Extraire les sections pertinentes de tous les CVs, puis encoder par lots
+    # (les CVs deja vus sont relus depuis le cache)
+    with timed(timer, "section_extraction", len(candidates)):
+        relevant_texts = [extract_relevant_sections(c["text"]) for c in candidates]
+    with timed(timer, "cv_embedding", len(candidates)):
+        cv_embeddings = embed_texts_cached(relevant_texts, batch_size, progress_callback)
+        return stack_embeddings(cv_embeddings)
+
+
+def prefilter_candidates(
+    job_description: str,
+    relevant_texts: List[str],
+    enabled: bool = LEXICAL_PREFILTER_ENABLED,
+    top_k: int = LEXICAL_PREFILTER_TOP_K,
+    min_pool: int = LEXICAL_PREFILTER_MIN_POOL,
+    timer: Optional[StageTimer] = None
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Premier etage lexical (BM25) : ne garde que les top_k CVs avant les embeddings.
+    Inactif si desactive ou si le lot ne depasse pas min_pool CVs.
+
+    Returns:
+        (indices des CVs conserves, scores BM25 de tous les CVs ou None)
+    """
+    total = len(relevant_texts)
+    if not enabled or total <= max(min_pool, top_k):
+        return np.arange(total), None
+    with timed(timer, "lexical_prefilter", total):
+        keep, lexical = lexical_prefilter(job_description, relevant_texts, top_k)
+    timed_count(timer, "prefilter_pruned", total - len(keep))
+    return keep, lexical
+
+
+def record_prefilter_savings(timer: Optional[StageTimer], kept: int, pruned: int):
+    """Estime le temps d'embedding economise par le prefiltre (cout moyen par CV encode)"""
+    if timer is None or not pruned or not kept or "cv_embedding" not in timer.stages:
+        return
+    per_cv = timer.stages["cv_embedding"]["seconds"] / timer.stages["cv_embedding"]["items"]
+    timer.count("prefilter_seconds_saved", per_cv * pruned)
+
+
 def score_candidates(
     job_description: str,
     candidates: List[Dict],
-    top_n: int = 5
+    top_n: int = 5,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    timer: Optional[StageTimer] = None
 ) -> List[Dict]:
     """
     Score chaque candidat par rapport a la description de poste.
@@ -121,21 +364,180 @@ def score_candidates(
         job_description: Texte de la description de poste
         candidates: Liste de dicts avec 'name', 'email', 'text', 'filename'
         top_n: Nombre de candidats a retenir
+        batch_size: Nombre de CVs encodes par lot
+        progress_callback: Appele apres chaque lot avec (CVs encodes, total)
+        timer: Mesure optionnelle du temps de chaque etape
 
     Returns:
         Liste des top_n candidats tries par score decroissant
     """
-    embeddings = get_embeddings()
-
     # Embedding de la description de poste
-    jd_embedding = embeddings.embed_query(job_description)
+    with timed(timer, "jd_embedding"):
+        jd_embedding = embed_texts_cached([job_description])[0]
+
+    with timed(timer, "section_extraction", len(candidates)):
+        relevant_texts = [extract_relevant_sections(c["text"]) for c in candidates]
+
+    # Prefiltre lexical optionnel : seuls les CVs conserves sont encodes
+    keep, lexical = prefilter_candidates(job_description, relevant_texts, timer=timer)
+
+    # Encoder par lots (les CVs deja vus sont relus depuis le cache)
+    with timed(timer, "cv_embedding", len(keep)):
+        cv_matrix = stack_embeddings(embed_texts_cached(
+            [relevant_texts[i] for i in keep], batch_size, progress_callback
+        ))
+    record_prefilter_savings(timer, len(keep), len(candidates) - len(keep))
+
+    with timed(timer, "ranking", len(keep)):
+        scores, _ = rank_by_similarity(jd_embedding, cv_matrix, 0)
+        if lexical is not None:
+            scores = fuse_scores(scores, lexical[keep], LEXICAL_FUSION_WEIGHT)
+        top_idx = top_n_indices(scores, top_n)
 
-    # Scorer chaque candidat sur les sections pertinentes
     for candidate in candidates:
-        relevant_text = extract_relevant_sections(candidate["text"])
-        cv_embedding = embeddings.embed_query(relevant_text)
-        candidate["score"] = cosine_similarity(jd_embedding, cv_embedding)
+        candidate["score"] = 0.0
+    for i, score in zip(keep.tolist(), scores.tolist()):
+        candidates[i]["score"] = score
+
+    # Garder les top_n par score decroissant
+    return [candidates[keep[i]] for i in top_idx]
+
+
+def assign_roles(scores: np.ndarray) -> Dict[int, int]:
+    """
+    Affecte au plus un candidat par poste (et un poste par candidat)
+    en maximisant la somme des scores.
+
+    Args:
+        scores: Matrice (n_postes, n_cvs)
+
+    Returns:
+        {indice du poste: indice du CV}
+    """
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        linear_sum_assignment = None
+
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(scores, maximize=True)
+        return {int(r): int(c) for r, c in zip(rows, cols)}
 
-    # Trier par score decroissant et garder les top_n
-    candidates.sort(key=lambda x: x["score"], reverse=True)
-    return candidates[:top_n]
+    # Sans scipy : affectation gloutonne par score decroissant
+    assignment, used = {}, set()
+    for flat in np.argsort(-scores, axis=None, kind="stable"):
+        role, cv = np.unravel_index(flat, scores.shape)
+        if role not in assignment and cv not in used:
+            assignment[int(role)] = int(cv)
+            used.add(cv)
+            if len(assignment) == min(scores.shape):
+                break
+    return assignment
+
+
+def match_roles(
+    jd_matrix: np.ndarray,
+    cv_matrix: np.ndarray,
+    top_n: int,
+    assign: bool = False
+) -> Dict:
+    """
+    Score tous les CVs contre tous les postes en un seul produit matriciel.
+
+    Args:
+        jd_matrix: Embeddings normalises des postes (n_postes, dim)
+        cv_matrix: Embeddings normalises des CVs (n_cvs, dim)
+        top_n: Nombre de candidats a retenir par poste
+        assign: Calculer aussi une affectation un candidat par poste
+
+    Returns:
+        Dict avec 'scores' (n_postes, n_cvs), 'per_role' (indices top_n par poste),
+        'best_role' / 'best_score' (par CV) et 'assignment' ({poste: CV} ou None)
+    """
+    if cv_matrix.shape[0] == 0:
+        empty = np.zeros((len(jd_matrix), 0), dtype=np.float32)
+        return {"scores": empty, "per_role": [np.zeros(0, dtype=np.int64)] * len(jd_matrix),
+                "best_role": np.zeros(0, dtype=np.int64), "best_score": np.zeros(0, dtype=np.float32),
+                "assignment": {} if assign else None}
+
+    scores = np.asarray(jd_matrix, dtype=np.float32) @ cv_matrix.T
+    return {
+        "scores": scores,
+        "per_role": [top_n_indices(row, top_n) for row in scores],
+        "best_role": np.argmax(scores, axis=0),
+        "best_score": scores.max(axis=0),
+        "assignment": assign_roles(scores) if assign else None,
+    }
+
+
+def score_candidates_multi(
+    job_descriptions: List[str],
+    candidates: List[Dict],
+    top_n: int = 5,
+    assign: bool = False,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    timer: Optional[StageTimer] = None
+) -> Dict:
+    """
+    Classe les candidats pour plusieurs postes en une passe : les CVs ne sont
+    extraits et encodes qu'une fois, les postes sont encodes ensemble.
+
+    Returns:
+        Dict avec 'rankings' (une liste de candidats par poste, chacun avec son
+        'score' pour ce poste), 'best_role' (chaque candidat avec l'indice 'role'
+        de son meilleur poste et le 'score' associe), 'assignment'
+        ({poste: candidat} ou None) et le resultat brut 'match'
+    """
+    with timed(timer, "jd_embedding", len(job_descriptions)):
+        jd_matrix = stack_embeddings(embed_texts_cached(job_descriptions))
+    cv_matrix = embed_candidates(candidates, batch_size, progress_callback, timer)
+    return match_candidates(jd_matrix, cv_matrix, candidates, top_n, assign, timer)
+
+
+def match_candidates(
+    jd_matrix: np.ndarray,
+    cv_matrix: np.ndarray,
+    candidates: List[Dict],
+    top_n: int,
+    assign: bool = False,
+    timer: Optional[StageTimer] = None
+) -> Dict:
+    """
+    Classement multi-postes a partir d'embeddings deja calcules
+    (partage par score_candidates_multi et l'etat incremental de l'interface).
+
+    Args:
+        jd_matrix: Embeddings normalises des postes (n_postes, dim)
+        cv_matrix: Embeddings normalises des CVs, dans l'ordre de candidates
+        candidates: Dicts des candidats
+        top_n: Nombre de candidats a retenir par poste
+        assign: Calculer aussi une affectation un candidat par poste
+        timer: Mesure optionnelle du temps de l'etape 'ranking'
+
+    Returns:
+        Meme structure que score_candidates_multi
+    """
+    with timed(timer, "ranking", len(candidates) * len(jd_matrix)):
+        match = match_roles(jd_matrix, cv_matrix, top_n, assign)
+
+    scores = match["scores"]
+    rankings = [
+        [dict(candidates[i], score=float(scores[role, i])) for i in top_idx]
+        for role, top_idx in enumerate(match["per_role"])
+    ]
+    assignment = None
+    if match["assignment"] is not None:
+        assignment = {
+            role: dict(candidates[cv], score=float(scores[role, cv]))
+            for role, cv in match["assignment"].items()
+        }
+    return {
+        "rankings": rankings,
+        "best_role": [
+            dict(c, role=int(role), score=float(score))
+            for c, role, score in zip(candidates, match["best_role"], match["best_score"])
+        ],
+        "assignment": assignment,
+        "match": match,
+    }
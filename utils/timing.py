@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure du temps passe dans chaque etape de l'analyse
+- Temps mur et debit (elements/s) par etape
+- Une ligne de log JSON par etape, pour suivre les regressions
+"""
+import json
+import logging
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional
+
+logger = logging.getLogger("talk2cvs.timing")
+
+# Libelles affiches dans la carte de stats
+STAGE_LABELS = {
+    "pdf_extraction": "Extraction PDF + contacts",
+    "candidate_records": "Fiches candidats",
+    "deduplication": "Doublons",
+    "pool_query": "Recherche vivier",
+    "section_extraction": "Sections CV",
+    "lexical_prefilter": "Prefiltre lexical",
+    "jd_embedding": "Embedding poste",
+    "cv_embedding": "Embedding CVs",
+    "ranking": "Classement",
+    "prompt_building": "Prompt LLM",
+    "llm_prompt_eval": "LLM lecture prompt",
+    "llm_ttft": "LLM 1er token",
+    "llm_total": "LLM total",
+}
+
+
+class StageTimer:
+    """Accumule les temps par etape pour une analyse"""
+
+    def __init__(self, run_id: Optional[str] = None, emit_logs: bool = True):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.emit_logs = emit_logs
+        self.stages: Dict[str, Dict] = {}
+        self.counters: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str, items: int = 1):
+        """Chronometre le bloc et l'enregistre sous le nom d'etape donne"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, items)
+
+    def record(self, name: str, seconds: float, items: int = 1):
+        """Enregistre une duree mesuree ailleurs (cumulee si l'etape existe deja)"""
+        entry = self.stages.setdefault(name, {"seconds": 0.0, "items": 0})
+        entry["seconds"] += seconds
+        entry["items"] += items
+        entry["items_per_sec"] = entry["items"] / entry["seconds"] if entry["seconds"] > 0 else None
+
+        if self.emit_logs:
+            logger.info(json.dumps({
+                "event": "stage_timing",
+                "run_id": self.run_id,
+                "stage": name,
+                "seconds": round(seconds, 6),
+                "items": items,
+            }))
+
+    def count(self, name: str, value: float):
+        """Enregistre un compteur associe a l'analyse (ex : CVs elagues)"""
+        self.counters[name] = self.counters.get(name, 0) + value
+        if self.emit_logs:
+            logger.info(json.dumps({
+                "event": "counter",
+                "run_id": self.run_id,
+                "name": name,
+                "value": value,
+            }))
+
+    def as_dict(self) -> Dict[str, Dict]:
+        """Copie des temps, dans l'ordre d'execution des etapes"""
+        return {name: dict(entry) for name, entry in self.stages.items()}
+
+
+def timed(timer: Optional[StageTimer], name: str, items: int = 1):
+    """Contexte de mesure, sans effet si aucun timer n'est fourni"""
+    if timer is None:
+        return nullcontext()
+    return timer.stage(name, items)
+
+
+def timed_count(timer: Optional[StageTimer], name: str, value: float):
+    """Compteur, sans effet si aucun timer n'est fourni"""
+    if timer is not None:
+        timer.count(name, value)
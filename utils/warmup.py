@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Prechauffage au demarrage de l'application
+- Chargement du modele d'embeddings dans un thread en arriere-plan
+- Prechargement optionnel du modele Ollama (requete keep-alive)
+- Rapport des couts d'import et de chargement
+"""
+import importlib
+import json
+import logging
+import threading
+import time
+from typing import Dict
+
+from config.settings import OLLAMA_BASE_URL, WARMUP_OLLAMA
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Etat partage du prechauffage (un seul par processus)"""
+
+    def __init__(self):
+        self.report: Dict[str, Dict] = {}
+        self.done = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self, preload_ollama: bool = WARMUP_OLLAMA) -> "Warmup":
+        """Lance le prechauffage en arriere-plan (sans effet s'il est deja lance)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, args=(preload_ollama,), name="talk2cvs-warmup", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def wait(self, timeout: float = None) -> bool:
+        """Attend la fin du prechauffage"""
+        return self.done.wait(timeout)
+
+    def _step(self, name: str, func):
+        start = time.perf_counter()
+        try:
+            func()
+            self.report[name] = {"seconds": time.perf_counter() - start, "ok": True}
+        except Exception as exc:
+            self.report[name] = {
+                "seconds": time.perf_counter() - start, "ok": False, "error": str(exc)
+            }
+            logger.warning("Prechauffage '%s' en echec : %s", name, exc)
+
+    def _run(self, preload_ollama: bool):
+        try:
+            from utils import scoring
+
+            self._step(
+                "import_langchain",
+                lambda: importlib.import_module("langchain_community.embeddings")
+            )
+            self._step(
+                "import_sentence_transformers",
+                lambda: importlib.import_module("sentence_transformers")
+            )
+            self._step("embedding_model_load", scoring.get_embeddings)
+            self._step(
+                "embedding_first_encode",
+                lambda: scoring.get_embeddings().embed_documents(["warmup"])
+            )
+            if preload_ollama:
+                self._step("ollama_preload", preload_ollama_model)
+            logger.info("Prechauffage termine : %s", json.dumps(self.report))
+        finally:
+            self.done.set()
+
+
+def preload_ollama_model(base_url: str = OLLAMA_BASE_URL):
+    """Charge le modele en memoire cote Ollama et ouvre une connexion du pool partage"""
+    from utils.ollama_client import get_ollama_client
+    get_ollama_client(base_url).preload()
+
+
+# Instance partagee par toutes les sessions du processus
+_warmup = Warmup()
+
+
+def start_warmup(preload_ollama: bool = WARMUP_OLLAMA) -> Warmup:
+    """Demarre (une seule fois) le prechauffage et retourne son etat"""
+    return _warmup.start(preload_ollama)
+
+
+def get_warmup() -> Warmup:
+    """Etat du prechauffage"""
+    return _warmup